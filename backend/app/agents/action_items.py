@@ -2,33 +2,216 @@
 Action Items Agent - Parallel agent for generating prioritized action items.
 
 Responsibilities:
-1. Research best practices using Perplexity
+1. Read best-practices research from the shared research node
 2. Generate exactly 5 action items based on gap analysis using GPT
 3. Structure output as ActionItemsList schema
 """
 
 import logging
+import threading
+from collections import Counter
 from langchain_core.runnables import RunnableConfig
-from langchain.prompts import ChatPromptTemplate
+from langchain_core.utils.json import parse_partial_json
 
 from app.agents.state import NegotiationState
-from app.agents.schemas import ActionItemsList, ActionItem
-from app.utils.perplexity import perplexity_search
-from app.utils.llm import get_llm
+from app.agents.schemas import ActionItemsList
+from app.utils.llm import get_llm, get_embeddings
+from app.utils.cache import TTLCache, SemanticCache, make_cache_key
+from app.utils.llm_batcher import LLMBatcher
 from app.config import get_settings
 from app.services.progress_tracker import get_progress_tracker
 
 logger = logging.getLogger(__name__)
 progress_tracker = get_progress_tracker()
 
+# Exact-match cache of generated ActionItemsList dicts (24h TTL)
+action_items_cache = TTLCache(ttl_seconds=86400)
+
+# Near-duplicate gap sets across jobs reuse the same action items. The prompt also
+# names the supplier and whether the target is achievable, so those partition the
+# semantic caches exactly and only the gap text is matched fuzzily
+# {(supplier_name, product_type, target_achievable): SemanticCache}
+action_items_semantic_caches = TTLCache(ttl_seconds=86400, max_entries=256)
+_semantic_caches_lock = threading.Lock()
+
+
+def get_action_items_semantic_cache(supplier_name: str, product_type: str, target_achievable: bool) -> SemanticCache:
+    """Get the semantic cache for one supplier/product/outcome partition (created on first use)."""
+    partition = make_cache_key("action_items_partition", {
+        "supplier_name": supplier_name,
+        "product_type": product_type,
+        "target_achievable": target_achievable,
+    })
+    with _semantic_caches_lock:
+        cache = action_items_semantic_caches.get(partition)
+        if cache is None:
+            cache = SemanticCache(threshold=0.92, ttl_seconds=86400)
+            action_items_semantic_caches.set(partition, cache)
+        return cache
+
+# Generation tiers, tried in order: the fast model serves most jobs, the accurate
+# model only runs when the fast output fails validation
+GENERATION_TIERS = ("fast", "accurate")
+tier_hits = Counter()
+
+
+def get_generation_llm(tier: str):
+    """Chat model for the given tier, forced to answer with an ActionItemsList tool call."""
+    return get_llm(temperature=0.5, tier=tier).bind_tools([ActionItemsList], tool_choice="ActionItemsList")
+
+
+# Coalesce generation calls across concurrent jobs when llm_batching_enabled is set
+action_items_batchers = {
+    tier: LLMBatcher(lambda tier=tier: get_generation_llm(tier))
+    for tier in GENERATION_TIERS
+}
+
+
+# ============================================================================
+# PROMPTS - built once at import; the system message has no template slots
+# ============================================================================
+SYSTEM_PROMPT = """You are a procurement action planning expert. Call the ActionItemsList tool with EXACTLY 5 action items based on the gap analysis.
+
+- Specific and actionable, focused on preparing for negotiation
+- Address gaps between request and offer
+- Ordered by impact; recommended=true for the top 2 only"""
+
+USER_PROMPT_TEMPLATE = """Supplier: {supplier_name}
+Product Type: {product_type}
+
+Offer Completeness: {completeness_score}/10
+Gaps: {completeness_notes}
+
+Hidden Cost Warnings:
+{hidden_cost_warnings}
+
+Key Risks:
+{key_risks}
+
+Target Achievable: {target_achievable}
+
+Best Practices Research:
+{research_content}"""
+
+
+def build_messages(**inputs) -> list:
+    """Build the chat messages for action item generation from the per-job inputs."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": USER_PROMPT_TEMPLATE.format(**inputs)},
+    ]
+
+
+async def stream_action_items(llm, messages: list, job_id: str) -> ActionItemsList:
+    """
+    Stream the ActionItemsList tool call, publishing progress as each item completes.
+
+    Args:
+        llm: Chat model bound to the ActionItemsList tool (see get_generation_llm)
+        messages: Chat messages from build_messages
+        job_id: Job ID for progress events
+
+    Returns:
+        Validated ActionItemsList
+    """
+    buffer = ""
+    items_reported = 0
+
+    async for chunk in llm.astream(messages):
+        args_delta = "".join(tool_chunk.get("args") or "" for tool_chunk in chunk.tool_call_chunks)
+        buffer += args_delta
+        # An item can only have completed if its closing brace just arrived
+        if "}" not in args_delta:
+            continue
+
+        partial_items = (parse_partial_json(buffer) or {}).get("items") or []
+        # The last item in a partial parse may still be streaming
+        while items_reported < len(partial_items) - 1:
+            item = partial_items[items_reported]
+            items_reported += 1
+            progress_tracker.publish_throttled(job_id, {
+                "agent": "action_items",
+                "status": "running",
+                "message": f"Drafted action item {items_reported}/5",
+                "detail": item.get("action", ""),
+                "progress": 0.25 + 0.02 * items_reported,
+                "agentProgress": 0.5 + 0.1 * items_reported
+            })
+
+    # pydantic-core parses and validates the JSON in one pass (no intermediate dict)
+    return ActionItemsList.model_validate_json(buffer)
+
+
+def validate_action_items(action_items: ActionItemsList):
+    """Reject outputs the schema cannot express (exactly 2 recommended items)."""
+    recommended_count = sum(1 for item in action_items.items if item.recommended)
+    if recommended_count != 2:
+        raise ValueError(f"Expected 2 recommended action items, got {recommended_count}")
+
+
+def normalize_recommended(action_items: ActionItemsList) -> ActionItemsList:
+    """Mark the first 2 items (ordered by impact) as recommended and the rest as not."""
+    return action_items.model_copy(update={"items": [
+        item.model_copy(update={"recommended": index < 2})
+        for index, item in enumerate(action_items.items)
+    ]})
+
+
+async def generate_action_items(
+    tier: str,
+    messages: list,
+    job_id: str,
+    batched: bool,
+    strict: bool = True
+) -> ActionItemsList:
+    """
+    Generate and validate action items with the given model tier.
+
+    Args:
+        tier: Model tier from GENERATION_TIERS
+        messages: Chat messages from build_messages
+        job_id: Job ID for progress events
+        batched: Submit through the cross-job batcher instead of streaming
+        strict: Reject a wrong recommended count (to escalate to the next tier)
+            instead of normalizing it
+
+    Returns:
+        Validated ActionItemsList
+
+    Raises:
+        ValueError: If the output is not valid JSON, or (strict only) fails validation
+    """
+    if batched:
+        # Bulk runs: share a provider request window with other in-flight jobs
+        response = await action_items_batchers[tier].submit(messages)
+        if not response.tool_calls:
+            raise ValueError("Model did not call the ActionItemsList tool")
+        action_items = ActionItemsList.model_validate(response.tool_calls[0]["args"])
+    else:
+        # Stream the tool call arguments so progress is reported per item
+        action_items = await stream_action_items(get_generation_llm(tier), messages, job_id)
+
+    if strict:
+        validate_action_items(action_items)
+        return action_items
+
+    try:
+        validate_action_items(action_items)
+    except ValueError as e:
+        # Last tier: a wrong flag count is cosmetic, not worth failing the briefing
+        logger.warning(f"[ACTION_ITEMS] {str(e)}, marking the first 2 as recommended")
+        action_items = normalize_recommended(action_items)
+    return action_items
+
 
 async def action_items_node(state: NegotiationState, config: RunnableConfig) -> NegotiationState:
     """
     Generate prioritized action items for the negotiation.
 
     Flow:
-    1. Research best practices using Perplexity
-    2. Use GPT to generate exactly 5 action items based on gaps
+    1. Gather gap analysis from the upstream agents
+    2. Use GPT to generate exactly 5 action items based on gaps and the
+       best-practices research from research_node
     3. Structure results as ActionItemsList
     4. Update state and progress
 
@@ -41,21 +224,21 @@ async def action_items_node(state: NegotiationState, config: RunnableConfig) ->
     """
     job_id = state["job_id"]
     settings = get_settings()
+    publish = progress_tracker.publish
 
     logger.info(f"[ACTION_ITEMS] Starting for job_id={job_id}")
 
-    await progress_tracker.publish(job_id, {
+    progress_tracker.publish_background(job_id, {
         "agent": "action_items",
         "status": "running",
         "message": "Generating action items...",
-        "detail": "Researching best practices",
-        "progress": 0.15,
-        "agentProgress": 0.0
+        "detail": "Creating prioritized action list",
+        "progress": 0.25,
+        "agentProgress": 0.5
     })
 
-    # Small delay to ensure SSE sends the message before blocking on Perplexity
-    import asyncio
-    await asyncio.sleep(0.1)
+    # Let SSE deliver the start event before blocking on GPT
+    await progress_tracker.flush(job_id)
 
     try:
         # Extract parsed input
@@ -66,49 +249,21 @@ async def action_items_node(state: NegotiationState, config: RunnableConfig) ->
             state["errors"].append(error_msg)
             return state
 
-        product_type = parsed_input["form_data"]["product_type"]
-        supplier_name = parsed_input["form_data"]["supplier_name"]
+        form_data = parsed_input["form_data"]
+        product_type = form_data["product_type"]
+        supplier_name = form_data["supplier_name"]
 
         # ========================================================================
-        # STEP 1: PERPLEXITY RESEARCH
-        # ========================================================================
-        await progress_tracker.publish(job_id, {
-            "agent": "action_items",
-            "status": "running",
-            "message": "Researching best practices...",
-            "detail": f"Looking up {product_type} negotiation checklists",
-            "progress": 0.18,
-            "agentProgress": 0.2
-        })
-
-        search_result = await perplexity_search(
-            query=f'contract negotiation action items checklist {product_type} procurement',
-            system_prompt="Provide a checklist of important action items for contract negotiations.",
-            api_key=settings.perplexity_api_key,
-            model="sonar-reasoning"
-        )
-
-        research_content = search_result.get("content", "") if search_result.get("success") else ""
-
-        await progress_tracker.publish(job_id, {
-            "agent": "action_items",
-            "status": "running",
-            "message": "Research complete, generating items...",
-            "detail": "Creating prioritized action list",
-            "progress": 0.25,
-            "agentProgress": 0.5
-        })
-
-        # ========================================================================
-        # STEP 2: GATHER CONTEXT FROM OTHER AGENTS
+        # STEP 1: GATHER CONTEXT FROM OTHER AGENTS
         # ========================================================================
         # Note: This agent runs after offer_analysis, market_analysis, and outcome_assessment
         # have completed, so their outputs are guaranteed to be available
 
-        # Get analysis results from other agents
-        offer_analysis = state.get("offer_analysis", {})
-        market_analysis = state.get("market_analysis", {})
-        outcome_assessment = state.get("outcome_assessment", {})
+        # Get analysis results from other agents (read each state key once)
+        offer_analysis = state.get("offer_analysis") or {}
+        market_analysis = state.get("market_analysis") or {}
+        outcome_assessment = state.get("outcome_assessment") or {}
+        research_context = state.get("research_context") or {}
 
         completeness_score = offer_analysis.get("completeness_score", 5)
         completeness_notes = offer_analysis.get("completeness_notes", "")
@@ -116,64 +271,57 @@ async def action_items_node(state: NegotiationState, config: RunnableConfig) ->
         key_risks = market_analysis.get("key_risks", [])
         target_achievable = outcome_assessment.get("target_achievable", False)
 
+        # Identical inputs produce the same action items - skip GPT on a hit
+        cache_key = make_cache_key("action_items", {
+            "product_type": product_type,
+            "supplier_name": supplier_name,
+            "completeness_score": completeness_score,
+            "completeness_notes": completeness_notes,
+            "hidden_cost_warnings": sorted(hidden_cost_warnings),
+            "key_risks": sorted(key_risks),
+            "target_achievable": target_achievable,
+        })
+        cached_items = action_items_cache.get(cache_key)
+
+        # Fall back to a semantic lookup on the gap signature within this partition
+        semantic_cache = get_action_items_semantic_cache(supplier_name, product_type, target_achievable)
+        signature_embedding = None
+        if cached_items is None:
+            signature = "|".join([
+                completeness_notes,
+                "|".join(sorted(hidden_cost_warnings)),
+                "|".join(sorted(key_risks)),
+            ])
+            try:
+                signature_embedding = await get_embeddings().aembed_query(signature)
+                cached_items = semantic_cache.get(signature_embedding)
+            except Exception as e:
+                # Semantic caching is best-effort - never fail the node over it
+                logger.warning(f"[ACTION_ITEMS] Gap signature embedding failed: {str(e)}")
+
+        if cached_items is not None:
+            logger.info(f"[ACTION_ITEMS] Cache hit, skipping generation")
+            await publish(job_id, {
+                "agent": "action_items",
+                "status": "completed",
+                "message": "✓ Action items ready",
+                "detail": "5 priority actions identified (cached)",
+                "progress": 0.35,
+                "agentProgress": 1.0
+            })
+            return {
+                "action_items": cached_items,
+                "agent_progress": {"action_items": 1.0}
+            }
+
+        # Best-practices research ran once in research_node, in parallel with the upstream agents
+        research_content = research_context.get(product_type, "")
+
         # ========================================================================
-        # STEP 3: GPT GENERATION
+        # STEP 2: GPT GENERATION
         # ========================================================================
 
-        # Create analysis prompt
-        analysis_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a procurement action planning expert. Generate EXACTLY 5 most important action items based on the gap analysis.
-
-Each action item should:
-- Be specific and actionable
-- Address gaps between request and offer
-- Be prioritized by impact
-- Focus on preparing for negotiation
-- Be categorized as one of: PRICE, TERMS, TIMELINE, or SCOPE
-
-The top 2 most impactful actions should be marked as RECOMMENDED.
-
-Format each item exactly as:
-[CATEGORY] Action description here
-
-Where CATEGORY is one of: PRICE, TERMS, TIMELINE, SCOPE
-Mark the top 2 with (RECOMMENDED) at the end."""),
-            ("user", """Supplier: {supplier_name}
-Product Type: {product_type}
-
-Offer Completeness: {completeness_score}/10
-Gaps: {completeness_notes}
-
-Hidden Cost Warnings:
-{hidden_cost_warnings}
-
-Key Risks:
-{key_risks}
-
-Target Achievable: {target_achievable}
-
-Best Practices Research:
-{research_content}
-
-Generate EXACTLY 5 action items in this format:
-1. [CATEGORY] Action description here (RECOMMENDED if top 2)
-2. [CATEGORY] Action description here (RECOMMENDED if top 2)
-3. [CATEGORY] Action description here
-4. [CATEGORY] Action description here
-5. [CATEGORY] Action description here
-
-Example:
-1. [PRICE] Request detailed breakdown of all costs and fees (RECOMMENDED)
-2. [TERMS] Negotiate payment terms from 30 to 60 days net (RECOMMENDED)
-3. [TIMELINE] Clarify delivery schedule and milestone dates
-4. [SCOPE] Define exact features included in base price
-5. [TERMS] Add termination clause with 90-day notice period""")
-        ])
-
-        llm = get_llm(temperature=0.5)
-        chain = analysis_prompt | llm
-
-        response = await chain.ainvoke({
+        messages = build_messages(**{
             "supplier_name": supplier_name,
             "product_type": product_type,
             "completeness_score": completeness_score,
@@ -181,75 +329,33 @@ Example:
             "hidden_cost_warnings": "\n".join(f"- {w}" for w in hidden_cost_warnings) if hidden_cost_warnings else "None",
             "key_risks": "\n".join(f"- {r}" for r in key_risks) if key_risks else "None",
             "target_achievable": "Yes" if target_achievable else "No",
-            "research_content": research_content[:800]
+            "research_content": research_content
         })
 
-        # Parse GPT response
-        response_text = response.content
-
-        # Extract numbered items with category and recommended flag
-        action_items_list = []
-        lines = response_text.split("\n")
-
-        import re
-        for line in lines:
-            line = line.strip()
-            # Look for numbered items (1., 2., etc.)
-            if line and len(line) > 2:
-                if line[0].isdigit() and (line[1] == '.' or line[1] == ')'):
-                    # Extract the content after the number
-                    content = line[2:].strip()
-
-                    # Parse format: [CATEGORY] Action description (RECOMMENDED)
-                    # Extract category using regex
-                    category_match = re.match(r'\[([A-Z]+)\]\s*(.*)', content)
-                    if category_match:
-                        category_raw = category_match.group(1).lower()
-                        remaining = category_match.group(2).strip()
-
-                        # Check if it's recommended
-                        is_recommended = "(recommended)" in remaining.lower()
-
-                        # Remove (RECOMMENDED) marker from action text
-                        action_text = re.sub(r'\(recommended\)', '', remaining, flags=re.IGNORECASE).strip()
-
-                        # Validate category
-                        if category_raw in ["price", "terms", "timeline", "scope"]:
-                            action_items_list.append(ActionItem(
-                                category=category_raw,
-                                action=action_text,
-                                recommended=is_recommended
-                            ))
-
-        # Ensure exactly 5 items (fallback)
-        while len(action_items_list) < 5:
-            # Add generic fallback items if parsing failed
-            fallback_categories = ["price", "terms", "timeline", "scope", "terms"]
-            category = fallback_categories[len(action_items_list)]
-            action_items_list.append(ActionItem(
-                category=category,
-                action=f"Review and address {category} requirements",
-                recommended=False
-            ))
-
-        # Take only first 5 if we got more
-        action_items_list = action_items_list[:5]
-
-        # Ensure exactly 2 items are marked as recommended
-        recommended_count = sum(1 for item in action_items_list if item.recommended)
-        if recommended_count != 2:
-            # Reset all to False
-            for item in action_items_list:
-                item.recommended = False
-            # Mark first 2 as recommended
-            action_items_list[0].recommended = True
-            action_items_list[1].recommended = True
-
-        # Build ActionItemsList
-        action_items = ActionItemsList(items=action_items_list)
-
-        logger.info(f"[ACTION_ITEMS] Completed successfully (generated {len(action_items_list)} items)")
-        await progress_tracker.publish(job_id, {
+        for tier in GENERATION_TIERS:
+            try:
+                action_items = await generate_action_items(
+                    tier, messages, job_id, settings.llm_batching_enabled,
+                    strict=tier != GENERATION_TIERS[-1]
+                )
+                break
+            except ValueError as e:
+                # JSON and schema validation errors are both ValueErrors; validation
+                # only decides whether to escalate, the last tier normalizes instead
+                if tier == GENERATION_TIERS[-1]:
+                    raise
+                logger.warning(f"[ACTION_ITEMS] {tier} model output rejected, falling back: {str(e)}")
+
+        tier_hits[tier] += 1
+        logger.info(f"[ACTION_ITEMS] Generated with {tier} model (tier hits: {dict(tier_hits)})")
+        # Dump once; the caches and the state update share the same dict
+        action_items_data = action_items.model_dump()
+        action_items_cache.set(cache_key, action_items_data)
+        if signature_embedding is not None:
+            semantic_cache.add(signature_embedding, action_items_data)
+
+        logger.info(f"[ACTION_ITEMS] Completed successfully (generated {len(action_items.items)} items)")
+        await publish(job_id, {
             "agent": "action_items",
             "status": "completed",
             "message": "✓ Action items ready",
@@ -260,7 +366,7 @@ Example:
 
         # Return ONLY the keys this agent updates
         return {
-            "action_items": action_items.dict(),
+            "action_items": action_items_data,
             "agent_progress": {"action_items": 1.0}
         }
 
@@ -268,12 +374,12 @@ Example:
         error_msg = f"Action items error: {str(e)}"
         logger.error(f"[ACTION_ITEMS] {error_msg}", exc_info=True)
 
-        await progress_tracker.publish(job_id, {
+        await publish(job_id, {
             "agent": "action_items",
             "status": "error",
             "message": "Action items generation failed",
             "detail": error_msg,
-            "progress": 0.15,
+            "progress": 0.25,
             "agentProgress": 0.0
         })
 
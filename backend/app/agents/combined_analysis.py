@@ -0,0 +1,375 @@
+"""
+Combined Analysis Agent - Market and offer analysis in a single GPT call.
+
+Responsibilities:
+1. Define the alternative/pricing and industry-standards research queries
+   (run by the research node in one shared batch)
+2. Analyze market pricing, positioning and key risks
+3. Compare the offer against the initial request (completeness, hidden costs)
+4. Structure output as MarketAnalysis and OfferAnalysis schemas
+
+Both analyses read the same supplier, pricing and research context, so one
+structured call returns both instead of billing the shared context twice.
+"""
+
+import logging
+from itertools import islice
+from langchain_core.runnables import RunnableConfig
+from langchain.prompts import ChatPromptTemplate
+
+from app.agents.state import NegotiationState
+from app.agents.schemas import CombinedAnalysis, MarketAnalysis, OfferAnalysis
+from app.utils.llm import get_structured_chain
+from app.utils.llm_batcher import LLMBatcher
+from app.utils.cache import TTLCache, make_cache_key
+from app.utils.prompt_compress import normalize_head, token_char_bound, truncate_at_boundary, truncate_tokens
+from app.config import get_settings
+from app.services.progress_tracker import get_progress_tracker
+
+logger = logging.getLogger(__name__)
+progress_tracker = get_progress_tracker()
+
+# Exact-match cache of CombinedAnalysis dicts (24h TTL); safe because the call is deterministic
+analysis_cache = TTLCache(ttl_seconds=86400)
+
+
+# ============================================================================
+# PROMPTS - compiled once at import and reused by every job
+# ============================================================================
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a strategic procurement analyst. Analyze the market position and the supplier's offer.
+
+Market analysis:
+1. Alternatives Overview: Synthesize information about alternative suppliers into a coherent 2-3 sentence overview
+2. Price Positioning: Analyze if the offer price is competitive, premium, or budget compared to market rates
+3. Key Risks: Identify exactly 3 key risks based on supplier research, offer gaps, and market position
+
+Offer analysis - compare the supplier's offer against the initial request and industry standards:
+1. Completeness Score (1-10): Rate how well the offer addresses the initial request requirements
+2. Completeness Notes: Highlight specific gaps between what was requested and what is offered
+3. Price Assessment: Compare offer_price (supplier's ask) to target_price (what we want) and max_price (our ceiling)
+4. Hidden Cost Warnings: Identify 2-4 potential hidden costs or missing items
+
+Be concise, critical, specific, and focused on negotiation leverage. The offer_price is the MAXIMUM the supplier is willing to accept."""),
+    ("user", """Supplier: {supplier_name}
+Product Type: {product_type}
+
+PRICING:
+- Offer Price: {offer_price} (supplier's maximum ask)
+- Target Price: {target_price} (our goal)
+- Max Price: {max_price} (our ceiling)
+
+ALTERNATIVES:
+{alternatives_context}
+
+MARKET RESEARCH:
+{market_research_context}
+
+INITIAL REQUEST:
+{initial_request}
+
+SUPPLIER OFFER:
+{supplier_offer}
+
+INDUSTRY STANDARDS:
+{offer_research_context}""")
+])
+
+# Bump when ANALYSIS_PROMPT or CombinedAnalysis changes so cached results for the old prompt are not reused
+ANALYSIS_TEMPLATE_VERSION = "combined_analysis_v1"
+
+# Token budgets for the request/offer documents and for each research result in the prompt
+DOCUMENT_TOKENS = 400
+MARKET_SNIPPET_TOKENS = 150
+OFFER_SNIPPET_TOKENS = 100
+
+# Cap on structured alternatives listed in the prompt (large supplier lists add tokens, not insight)
+MAX_PROMPT_ALTERNATIVES = 10
+
+# Prefixes of the market/offer keys in state["research_results"]
+MARKET_RESEARCH_PREFIX = "market_"
+OFFER_RESEARCH_PREFIX = "offer_"
+
+# Fallback content when the structured call fails (copied into lists only on that path)
+_DEFAULT_RISKS = ("Market data unavailable", "Limited competitive intelligence", "Unable to assess positioning")
+_DEFAULT_HIDDEN_COSTS = ("Review all line items carefully", "Check for implementation fees", "Verify ongoing costs")
+
+
+def build_research_queries(parsed_input: dict) -> list:
+    """
+    Build the market and offer Perplexity queries for the shared research batch.
+
+    The research node runs them together with its own query, so the keys carry
+    MARKET_RESEARCH_PREFIX / OFFER_RESEARCH_PREFIX to tell the results apart.
+
+    Args:
+        parsed_input: Output from parse node (ParsedInput dict)
+
+    Returns:
+        List of query dicts for cached_perplexity_batch_search
+    """
+    supplier_name = parsed_input["form_data"]["supplier_name"]
+    product_type = parsed_input["form_data"]["product_type"]
+    alternatives = parsed_input.get("alternatives", [])
+
+    queries = []
+
+    # Research each alternative
+    for i, alt in enumerate(islice(alternatives, 3)):  # Limit to top 3 alternatives
+        queries.append({
+            "key": f"{MARKET_RESEARCH_PREFIX}alternative_{i}",
+            "template_id": "alt_vs_supplier",
+            "params": {"alt": alt["name"], "supplier": supplier_name, "product": product_type},
+            "system_prompt": "Compare these suppliers objectively, focusing on pricing and key differences."
+        })
+
+    # Market positioning query
+    queries.append({
+        "key": f"{MARKET_RESEARCH_PREFIX}market_position",
+        "template_id": "market_position",
+        "params": {"supplier": supplier_name, "product": product_type},
+        "system_prompt": "Analyze this company's market position and reputation."
+    })
+
+    # Pricing benchmarks query
+    queries.append({
+        "key": f"{MARKET_RESEARCH_PREFIX}pricing_benchmarks",
+        "template_id": "pricing_benchmarks",
+        "params": {"product": product_type},
+        "system_prompt": "Provide typical pricing ranges for this product/service type."
+    })
+
+    # Industry standards queries for the offer comparison
+    queries.extend([
+        {
+            "key": f"{OFFER_RESEARCH_PREFIX}standards",
+            "template_id": "standards",
+            "params": {"product": product_type},
+            "system_prompt": "Provide typical contract terms and deliverables for this product type."
+        },
+        {
+            "key": f"{OFFER_RESEARCH_PREFIX}deliverables",
+            "template_id": "deliverables",
+            "params": {"product": product_type},
+            "system_prompt": "List common deliverables and scope items for this product/service."
+        },
+        {
+            "key": f"{OFFER_RESEARCH_PREFIX}hidden_costs",
+            "template_id": "hidden_costs",
+            "params": {"product": product_type},
+            "system_prompt": "Identify potential hidden costs and common pricing pitfalls."
+        }
+    ])
+
+    return queries
+
+
+def build_research_context(research_results: dict, prefix: str, max_tokens: int) -> str:
+    """
+    Format one slice of the shared research results for the prompt.
+
+    Args:
+        research_results: state["research_results"]
+        prefix: Key prefix of the slice (MARKET_RESEARCH_PREFIX or OFFER_RESEARCH_PREFIX)
+        max_tokens: Token budget per result
+
+    Returns:
+        Labelled research blocks, empty if no query in the slice succeeded
+    """
+    research_context = ""
+    for key, result in research_results.items():
+        if key.startswith(prefix) and result.get("success"):
+            label = key[len(prefix):].upper()
+            research_context += f"\n\n{label}:\n{truncate_tokens(result['content'], max_tokens)}"
+    return research_context
+
+
+# Coalesce analysis calls across concurrent jobs when llm_batching_enabled is set
+analysis_batcher = LLMBatcher(lambda: get_structured_chain(ANALYSIS_PROMPT, CombinedAnalysis, temperature=0.0))
+
+
+async def combined_analysis_node(state: NegotiationState, config: RunnableConfig) -> NegotiationState:
+    """
+    Analyze the market position and the supplier's offer in one GPT call.
+
+    Flow:
+    1. Read the market and offer research from state["research_results"]
+    2. Use GPT to produce both analyses as one CombinedAnalysis
+    3. Split it into MarketAnalysis and OfferAnalysis
+    4. Update state and progress (reported under both agents)
+
+    Args:
+        state: Current negotiation state
+        config: Runnable config
+
+    Returns:
+        Updated state with market_analysis and offer_analysis populated
+    """
+    job_id = state["job_id"]
+    settings = get_settings()
+
+    logger.info(f"[COMBINED_ANALYSIS] Starting for job_id={job_id}")
+
+    # Validate before announcing the agents - a failed job returns without any events
+    parsed_input = state.get("parsed_input")
+    if not parsed_input:
+        error_msg = "Missing parsed_input"
+        logger.error(f"[COMBINED_ANALYSIS] {error_msg}")
+        return {"errors": [error_msg]}
+
+    progress_tracker.publish_throttled(job_id, {
+        "agent": "market_analysis",
+        "status": "running",
+        "message": "Research complete, analyzing data...",
+        "detail": "Using GPT to synthesize findings",
+        "progress": 0.25,
+        "agentProgress": 0.5
+    })
+    progress_tracker.publish_throttled(job_id, {
+        "agent": "offer_analysis",
+        "status": "running",
+        "message": "Research complete, analyzing offer...",
+        "detail": "Comparing offer to requirements",
+        "progress": 0.25,
+        "agentProgress": 0.5
+    })
+
+    try:
+        supplier_name = parsed_input["form_data"]["supplier_name"]
+        product_type = parsed_input["form_data"]["product_type"]
+        offer_price = parsed_input["form_data"]["offer_price"]
+        target_price = parsed_input["form_data"]["target_price"]
+        max_price = parsed_input["form_data"]["max_price"]
+        alternatives = parsed_input.get("alternatives", [])
+        alternatives_pdf_text = state.get("alternatives_pdf")  # Full PDF text for context
+
+        logger.info(
+            f"[COMBINED_ANALYSIS] Analyzing {len(alternatives)} alternatives, "
+            f"offer: {offer_price} vs target: {target_price}"
+        )
+
+        # ========================================================================
+        # GPT ANALYSIS
+        # ========================================================================
+
+        # Research ran in the shared batch (research node)
+        research_results = state.get("research_results") or {}
+
+        # Build alternatives context - use full PDF text if available, otherwise use structured list
+        if alternatives_pdf_text:
+            alternatives_context = f"Full alternatives document:\n{truncate_at_boundary(normalize_head(alternatives_pdf_text, 2000), 2000)}"
+        else:
+            alternatives_lines = [
+                f"- {alt['name']}: {alt.get('description', 'N/A')}"
+                for alt in islice(alternatives, MAX_PROMPT_ALTERNATIVES)
+            ]
+            if alternatives_lines:
+                alternatives_context = "Structured alternatives list:\n" + "\n".join(alternatives_lines)
+            else:
+                alternatives_context = "No alternatives provided"
+
+        analysis_inputs = {
+            "supplier_name": supplier_name,
+            "product_type": product_type,
+            "offer_price": offer_price,
+            "target_price": target_price,
+            "max_price": max_price,
+            "alternatives_context": alternatives_context,
+            "market_research_context": build_research_context(
+                research_results, MARKET_RESEARCH_PREFIX, MARKET_SNIPPET_TOKENS
+            ),
+            "initial_request": truncate_tokens(
+                normalize_head(state["initial_request_pdf"], token_char_bound(DOCUMENT_TOKENS)), DOCUMENT_TOKENS
+            ),
+            "supplier_offer": truncate_tokens(
+                normalize_head(state["supplier_offer_pdf"], token_char_bound(DOCUMENT_TOKENS)), DOCUMENT_TOKENS
+            ),
+            "offer_research_context": build_research_context(
+                research_results, OFFER_RESEARCH_PREFIX, OFFER_SNIPPET_TOKENS
+            ),
+        }
+
+        # Similar jobs repeat the same inputs - skip GPT on a hit
+        cache_key = make_cache_key("combined_analysis", {
+            "template": ANALYSIS_TEMPLATE_VERSION,
+            "inputs": analysis_inputs,
+        })
+        combined_analysis = analysis_cache.get(cache_key)
+
+        if combined_analysis is not None:
+            logger.info(f"[COMBINED_ANALYSIS] Cache hit, skipping GPT analysis")
+        else:
+            # Function calling returns a validated CombinedAnalysis - no text to parse
+            try:
+                if settings.llm_batching_enabled:
+                    # Bulk runs: share a provider request window with other in-flight jobs
+                    result = await analysis_batcher.submit(analysis_inputs)
+                else:
+                    chain = get_structured_chain(ANALYSIS_PROMPT, CombinedAnalysis, temperature=0.0)
+                    result = await chain.ainvoke(analysis_inputs)
+
+                combined_analysis = result.model_dump()
+                analysis_cache.set(cache_key, combined_analysis)
+            except Exception as e:
+                # Don't fail the node over the synthesis step - fall back to defaults
+                logger.warning(f"[COMBINED_ANALYSIS] Structured analysis failed, using defaults: {str(e)}")
+                combined_analysis = CombinedAnalysis(
+                    market_analysis=MarketAnalysis(
+                        alternatives_overview="No alternatives analysis available",
+                        price_positioning="Insufficient data for price positioning",
+                        key_risks=list(_DEFAULT_RISKS)
+                    ),
+                    offer_analysis=OfferAnalysis(
+                        completeness_score=5,
+                        completeness_notes="Unable to assess completeness",
+                        price_assessment=f"Offer price: {offer_price}, Target: {target_price}, Max: {max_price}",
+                        hidden_cost_warnings=list(_DEFAULT_HIDDEN_COSTS)
+                    )
+                ).model_dump()
+
+        market_analysis = combined_analysis["market_analysis"]
+        offer_analysis = combined_analysis["offer_analysis"]
+        completeness_score = offer_analysis["completeness_score"]
+
+        logger.info(f"[COMBINED_ANALYSIS] Completed successfully (score: {completeness_score}/10)")
+        progress_tracker.publish_throttled(job_id, {
+            "agent": "market_analysis",
+            "status": "completed",
+            "message": "✓ Market analysis complete",
+            "detail": f"Analyzed {len(alternatives)} alternatives",
+            "progress": 0.35,
+            "agentProgress": 1.0
+        })
+        progress_tracker.publish_throttled(job_id, {
+            "agent": "offer_analysis",
+            "status": "completed",
+            "message": "✓ Offer analysis complete",
+            "detail": f"Completeness score: {completeness_score}/10",
+            "progress": 0.35,
+            "agentProgress": 1.0
+        })
+
+        # Return ONLY the keys this agent updates
+        return {
+            "market_analysis": market_analysis,
+            "offer_analysis": offer_analysis,
+            "agent_progress": {"market_analysis": 1.0, "offer_analysis": 1.0}
+        }
+
+    except Exception as e:
+        error_msg = f"Combined analysis error: {str(e)}"
+        logger.error(f"[COMBINED_ANALYSIS] {error_msg}", exc_info=True)
+
+        for agent, message in (("market_analysis", "Market analysis failed"), ("offer_analysis", "Offer analysis failed")):
+            progress_tracker.publish_throttled(job_id, {
+                "agent": agent,
+                "status": "error",
+                "message": message,
+                "detail": error_msg,
+                "progress": 0.15,
+                "agentProgress": 0.0
+            })
+
+        return {
+            "errors": [error_msg]
+        }
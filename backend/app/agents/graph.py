@@ -6,39 +6,44 @@ START → parse → [5 parallel agents] → END
 
 Agents run in parallel after parse completes:
 - supplier_summary: Company research
-- market_analysis: Competitive analysis
-- offer_analysis: Gap analysis
+- combined_analysis: Competitive and gap analysis (one GPT call)
 - outcome_assessment: Strategy generation
 - action_items: Action planning
 """
 
+from functools import lru_cache
+from typing import List, Union
 from langgraph.graph import StateGraph, END
 from app.agents.state import NegotiationState
 from app.agents.parse import parse_node
 from app.agents.supplier_summary import supplier_summary_node
-from app.agents.market_analysis import market_analysis_node
-from app.agents.offer_analysis import offer_analysis_node
+from app.agents.combined_analysis import combined_analysis_node
 from app.agents.outcome_assessment import outcome_assessment_node
+from app.agents.research import research_node
 from app.agents.action_items import action_items_node
 
 
-def should_continue_after_parse(state: NegotiationState) -> str:
+# Tier 1 nodes - started together in one superstep once parse succeeds
+TIER1_NODES = ["supplier_summary_agent", "research"]
+
+
+def should_continue_after_parse(state: NegotiationState) -> Union[str, List[str]]:
     """
     Check if pipeline should continue after parse node.
 
     If parse fails with critical errors, stop the pipeline.
-    Otherwise, continue to parallel agents.
+    Otherwise, fan out to all Tier 1 agents at once.
 
     Args:
         state: Current negotiation state
 
     Returns:
-        "continue" if no critical errors, "end" if parse failed
+        TIER1_NODES if no critical errors, END if parse failed
     """
-    if state.get("errors") and len(state["errors"]) > 0:
+    if state.get("errors"):
         # Parse node had critical errors (missing documents)
-        return "end"
-    return "continue"
+        return END
+    return TIER1_NODES
 
 
 def create_negotiation_graph():
@@ -46,9 +51,10 @@ def create_negotiation_graph():
     Create the LangGraph workflow with proper dependency ordering.
 
     Flow (based on data dependencies):
-    START → parse → [Tier 1: supplier_summary, market_analysis, offer_analysis (parallel)]
-                  → [Tier 2: outcome_assessment (waits for market + offer)]
-                  → [Tier 3: action_items (waits for all above)]
+    START → parse → [Tier 1: supplier_summary, research (parallel)]
+                  → [Tier 2: combined_analysis (waits for research)]
+                  → [Tier 3: outcome_assessment (waits for combined_analysis)]
+                  → [Tier 4: action_items (waits for all above)]
                   → END
 
     Parse Node:
@@ -58,14 +64,19 @@ def create_negotiation_graph():
 
     Tier 1 Agents (parallel - no dependencies on each other):
     - supplier_summary: Company research (independent)
-    - market_analysis: Competitive analysis (independent)
-    - offer_analysis: Gap analysis (independent)
+    - research: Shared research - product-type best practices in
+      state["research_context"], plus the market/offer queries as one Perplexity
+      batch in state["research_results"]
+
+    Tier 2 Agent (depends on research):
+    - combined_analysis: Competitive and gap analysis in one structured GPT
+      call, writing both market_analysis and offer_analysis
 
-    Tier 2 Agent (depends on Tier 1):
+    Tier 3 Agent (depends on Tier 2):
     - outcome_assessment: Needs market_analysis + offer_analysis
 
-    Tier 3 Agent (depends on Tier 1 + Tier 2):
-    - action_items: Needs offer_analysis + market_analysis + outcome_assessment
+    Tier 4 Agent (depends on all above):
+    - action_items: Needs offer_analysis + market_analysis + outcome_assessment + research
 
     Error Handling:
     - Parse failure stops entire pipeline (critical)
@@ -83,9 +94,9 @@ def create_negotiation_graph():
     # ========================================================================
     workflow.add_node("parse", parse_node)
     workflow.add_node("supplier_summary_agent", supplier_summary_node)
-    workflow.add_node("market_analysis_agent", market_analysis_node)
-    workflow.add_node("offer_analysis_agent", offer_analysis_node)
+    workflow.add_node("combined_analysis_agent", combined_analysis_node)
     workflow.add_node("outcome_assessment_agent", outcome_assessment_node)
+    workflow.add_node("research", research_node)
     workflow.add_node("action_items_agent", action_items_node)
 
     # ========================================================================
@@ -97,28 +108,25 @@ def create_negotiation_graph():
     # ADD EDGES - TIERED EXECUTION WITH DEPENDENCIES
     # ========================================================================
 
-    # After parse: check for critical errors
+    # After parse: check for critical errors, then start TIER 1 in parallel
+    # (no inter-dependencies). All Tier 1 nodes sit behind the check so a failed
+    # parse never spends Perplexity/GPT calls on a job that is already dead.
     workflow.add_conditional_edges(
         "parse",
         should_continue_after_parse,
-        {
-            "continue": "supplier_summary_agent",
-            "end": END
-        }
+        [*TIER1_NODES, END]
     )
 
-    # TIER 1: Parallel execution from parse (no inter-dependencies)
-    workflow.add_edge("parse", "market_analysis_agent")
-    workflow.add_edge("parse", "offer_analysis_agent")
-
     # supplier_summary is independent, terminates at END
     workflow.add_edge("supplier_summary_agent", END)
 
-    # TIER 2: outcome_assessment waits for market_analysis AND offer_analysis
-    workflow.add_edge("market_analysis_agent", "outcome_assessment_agent")
-    workflow.add_edge("offer_analysis_agent", "outcome_assessment_agent")
+    # TIER 2: combined_analysis reads the shared research batch
+    workflow.add_edge("research", "combined_analysis_agent")
+
+    # TIER 3: outcome_assessment waits for combined_analysis (market_analysis AND offer_analysis)
+    workflow.add_edge("combined_analysis_agent", "outcome_assessment_agent")
 
-    # TIER 3: action_items waits for outcome_assessment (which already waited for tier 1)
+    # TIER 4: action_items waits for outcome_assessment (which already waited for research)
     workflow.add_edge("outcome_assessment_agent", "action_items_agent")
 
     # Final agent terminates
@@ -128,6 +136,14 @@ def create_negotiation_graph():
 
 
 # ============================================================================
-# CREATE COMPILED GRAPH INSTANCE
+# COMPILED GRAPH INSTANCE - built on first use, not at import
 # ============================================================================
-negotiation_graph = create_negotiation_graph()
+@lru_cache(maxsize=1)
+def get_negotiation_graph():
+    """
+    Get the compiled negotiation graph, compiling it on the first call.
+
+    Returns:
+        Compiled LangGraph workflow (shared by all jobs)
+    """
+    return create_negotiation_graph()
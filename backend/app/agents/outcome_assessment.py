@@ -8,14 +8,19 @@ Responsibilities:
 4. Structure output as OutcomeAssessment schema
 """
 
+import asyncio
 import logging
+import re
+from types import MappingProxyType
 from langchain_core.runnables import RunnableConfig
 from langchain.prompts import ChatPromptTemplate
 
 from app.agents.state import NegotiationState
 from app.agents.schemas import OutcomeAssessment
-from app.utils.perplexity import perplexity_batch_search
-from app.utils.llm import get_llm
+from app.utils.perplexity import cached_perplexity_batch_search
+from app.utils.llm import get_chain
+from app.utils.llm_batcher import LLMBatcher
+from app.utils.prompt_compress import truncate_tokens
 from app.config import get_settings
 from app.services.progress_tracker import get_progress_tracker
 
@@ -23,16 +28,183 @@ logger = logging.getLogger(__name__)
 progress_tracker = get_progress_tracker()
 
 
+# ============================================================================
+# PROMPTS - compiled once at import; the system messages (instructions and output
+# format) have no template slots and the deal context comes last
+# ============================================================================
+LEVERAGE_SYSTEM_PROMPT = """You are a strategic negotiation advisor. Based on the research and analysis, list 3-5 specific negotiation leverage points based on alternatives, gaps, market position, urgency.
+
+Be specific and actionable. Focus on what gives the buyer power in this negotiation.
+
+Provide your analysis in this exact format:
+LEVERAGE 1: [specific leverage point]
+LEVERAGE 2: [specific leverage point]
+LEVERAGE 3: [specific leverage point]
+LEVERAGE 4: [specific leverage point]
+LEVERAGE 5: [specific leverage point]"""
+
+TACTICS_SYSTEM_PROMPT = """You are a strategic negotiation advisor. Based on the research and analysis, provide 3-5 concrete tactical tips for this specific negotiation.
+
+Be specific and actionable. Focus on what gives the buyer power in this negotiation.
+
+Provide your analysis in this exact format:
+TACTIC 1: [specific tactic]
+TACTIC 2: [specific tactic]
+TACTIC 3: [specific tactic]
+TACTIC 4: [specific tactic]
+TACTIC 5: [specific tactic]"""
+
+# Deal context shared by both prompts
+CONTEXT_TEMPLATE = """Supplier: {supplier_name}
+Target Achievable: {target_achievable}
+Confidence: {confidence}
+
+Pricing:
+- Offer: {offer_price}
+- Target: {target_price}
+- Max: {max_price}
+
+Offer Completeness Score: {completeness_score}/10
+
+Alternatives: {alternatives_overview}
+
+Key Risks: {key_risks}
+
+Industry Research:
+{research_context}"""
+
+# Leverage and tactics are independent, so they are requested concurrently
+# and the node waits for the slower of the two instead of one long answer
+LEVERAGE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", LEVERAGE_SYSTEM_PROMPT),
+    ("user", CONTEXT_TEMPLATE)
+])
+
+TACTICS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", TACTICS_SYSTEM_PROMPT),
+    ("user", CONTEXT_TEMPLATE)
+])
+
+# "LEVERAGE 1: ..." / "TACTIC 3: ..." lines -> (kind, point)
+_POINT_RE = re.compile(r"^[ \t]*(LEVERAGE|TACTIC)[^:\n]*:[ \t]*(.+?)[ \t\r]*$", re.M)
+
+# Leverage points plus tactics requested across both prompts (5 each)
+STREAMED_POINT_COUNT = 10
+
+# Coalesce analysis calls across concurrent jobs when llm_batching_enabled is set
+leverage_batcher = LLMBatcher(lambda: get_chain(LEVERAGE_PROMPT, temperature=0.4))
+tactics_batcher = LLMBatcher(lambda: get_chain(TACTICS_PROMPT, temperature=0.4))
+
+
+# value_assessment -> confidence level (read-only, shared by all jobs)
+CONFIDENCE_MAP = MappingProxyType({
+    "urgent": "High",
+    "high_impact": "High",
+    "medium_impact": "Medium",
+    "low_impact": "Low"
+})
+
+# value_assessment -> partnership recommendation (read-only, shared by all jobs)
+PARTNERSHIP_MAP = MappingProxyType({
+    "urgent": "Strategic Partner",
+    "high_impact": "Strategic Partner",
+    "medium_impact": "Preferred Vendor",
+    "low_impact": "Transactional"
+})
+
+# Token budget for each research result in the prompt (about the 500 characters previously sent)
+RESEARCH_SNIPPET_TOKENS = 125
+
+# Fallback content when the response has no LEVERAGE/TACTIC lines (copied into lists only on that path)
+_DEFAULT_LEVERAGE = ("Multiple alternatives available", "Gaps in offer provide leverage", "Market competition")
+_DEFAULT_TACTICS = ("Highlight offer gaps", "Reference alternatives", "Emphasize value assessment")
+
+
+# Everything except digits and separators (currency symbols/codes, spaces)
+_PRICE_RE = re.compile(r"[^\d.,]")
+# A minus before the first digit ("-500", "€ -500") makes the price negative
+_NEGATIVE_PRICE_RE = re.compile(r"^[^\d]*-")
+
+
 def parse_price(price_str: str) -> float:
-    """Extract numeric value from price string."""
+    """
+    Extract numeric value from price string.
+
+    Handles currency symbols/codes and both "1,234.50" and "1.234,50" formats:
+    when both separators occur, the last one is the decimal point; a lone comma
+    followed by 1-2 digits is a decimal comma; a lone dot followed by exactly 3
+    digits ("€45.000") and repeated separators group thousands. A leading minus
+    keeps the sign.
+    """
+    if not price_str:
+        return 0.0
+
+    price_str = str(price_str)
+    sign = -1.0 if _NEGATIVE_PRICE_RE.match(price_str) else 1.0
+    clean_price = _PRICE_RE.sub("", price_str)
+    last_comma = clean_price.rfind(",")
+    last_dot = clean_price.rfind(".")
+
+    if last_comma >= 0 and last_dot >= 0:
+        if last_comma > last_dot:
+            clean_price = clean_price.replace(".", "").replace(",", ".")
+        else:
+            clean_price = clean_price.replace(",", "")
+    elif last_comma >= 0:
+        is_decimal_comma = clean_price.count(",") == 1 and len(clean_price) - last_comma - 1 in (1, 2)
+        clean_price = clean_price.replace(",", ".") if is_decimal_comma else clean_price.replace(",", "")
+    elif clean_price.count(".") > 1 or (last_dot >= 0 and len(clean_price) - last_dot - 1 == 3):
+        clean_price = clean_price.replace(".", "")
+
     try:
-        # Remove currency symbols and commas
-        clean_price = ''.join(c for c in str(price_str) if c.isdigit() or c == '.')
-        return float(clean_price) if clean_price else 0.0
-    except:
+        return sign * float(clean_price) if clean_price else 0.0
+    except ValueError:
         return 0.0
 
 
+async def stream_points(chain, inputs: dict, job_id: str, points_reported: dict) -> str:
+    """
+    Stream a leverage or tactics response, publishing each point as its line completes.
+
+    Args:
+        chain: get_chain(LEVERAGE_PROMPT, ...) or get_chain(TACTICS_PROMPT, ...)
+        inputs: Prompt variables
+        job_id: Job ID for progress events
+        points_reported: {"count": n} shared by the concurrent streams so progress only moves forward
+
+    Returns:
+        Full response text
+    """
+    response_text = ""
+    lines_seen = 0
+
+    async for chunk in chain.astream(inputs):
+        response_text += chunk.content
+        # A point line can only have completed if a newline just arrived
+        if "\n" not in chunk.content:
+            continue
+
+        completed_lines = response_text.split("\n")[:-1]
+        for line in completed_lines[lines_seen:]:
+            match = _POINT_RE.match(line)
+            if not match:
+                continue
+            kind, point = match.groups()
+            points_reported["count"] += 1
+            count = min(points_reported["count"], STREAMED_POINT_COUNT)
+            progress_tracker.publish_throttled(job_id, {
+                "agent": "outcome_assessment",
+                "status": "running",
+                "message": f"Building strategy ({count}/{STREAMED_POINT_COUNT})",
+                "detail": f"{kind.title()}: {point}",
+                "progress": 0.25 + 0.1 * count / STREAMED_POINT_COUNT,
+                "agentProgress": 0.5 + 0.4 * count / STREAMED_POINT_COUNT
+            })
+        lines_seen = len(completed_lines)
+
+    return response_text
+
+
 async def outcome_assessment_node(state: NegotiationState, config: RunnableConfig) -> NegotiationState:
     """
     Assess negotiation outcomes and generate strategy.
@@ -40,7 +212,7 @@ async def outcome_assessment_node(state: NegotiationState, config: RunnableConfi
     Flow:
     1. Research negotiation tactics using Perplexity
     2. Calculate target_achievable (offer_price <= target_price)
-    3. Use GPT to generate tactics and leverage points
+    3. Use GPT to generate leverage points and tactics (two concurrent calls)
     4. Structure results as OutcomeAssessment
     5. Update state and progress
 
@@ -56,7 +228,7 @@ async def outcome_assessment_node(state: NegotiationState, config: RunnableConfi
 
     logger.info(f"[OUTCOME_ASSESSMENT] Starting for job_id={job_id}")
 
-    await progress_tracker.publish(job_id, {
+    progress_tracker.publish_background(job_id, {
         "agent": "outcome_assessment",
         "status": "running",
         "message": "Starting outcome assessment...",
@@ -65,10 +237,8 @@ async def outcome_assessment_node(state: NegotiationState, config: RunnableConfi
         "agentProgress": 0.0
     })
 
-    # Small delay to ensure SSE sends the message before blocking on Perplexity
-    import asyncio
-    await asyncio.sleep(0.1)
-
+    # Started inside the try block; cancelled there if the node fails before awaiting it
+    search_task = None
     try:
         # Extract parsed input
         parsed_input = state.get("parsed_input")
@@ -95,75 +265,49 @@ async def outcome_assessment_node(state: NegotiationState, config: RunnableConfi
         # ========================================================================
         # STEP 1: PERPLEXITY RESEARCH
         # ========================================================================
-        await progress_tracker.publish(job_id, {
-            "agent": "outcome_assessment",
-            "status": "running",
-            "message": "Researching negotiation tactics...",
-            "detail": f"Finding leverage for {product_type} deals",
-            "progress": 0.18,
-            "agentProgress": 0.2
-        })
-
         queries = [
             {
                 "key": "tactics",
-                "query": f'negotiation tactics {product_type} contracts best practices',
+                "template_id": "tactics",
+                "params": {"product": product_type},
                 "system_prompt": "Provide specific, actionable negotiation tactics for this type of deal."
             },
             {
                 "key": "leverage",
-                "query": f'supplier negotiation leverage points {product_type} procurement',
+                "template_id": "leverage",
+                "params": {"product": product_type},
                 "system_prompt": "Identify common leverage points buyers have in these negotiations."
             }
         ]
 
-        search_results = await perplexity_batch_search(
+        # The queries depend only on product_type, so repeat jobs are served by the
+        # Perplexity disk/semantic caches. Start the searches first, then let SSE
+        # deliver the queued events while they are in flight
+        search_task = asyncio.create_task(cached_perplexity_batch_search(
             queries=queries,
             api_key=settings.perplexity_api_key,
             model="sonar-reasoning"
-        )
-
-        await progress_tracker.publish(job_id, {
+        ))
+        progress_tracker.publish_background(job_id, {
             "agent": "outcome_assessment",
             "status": "running",
-            "message": "Research complete, building strategy...",
-            "detail": "Generating negotiation recommendations",
-            "progress": 0.25,
-            "agentProgress": 0.5
+            "message": "Researching negotiation tactics...",
+            "detail": f"Finding leverage for {product_type} deals",
+            "progress": 0.18,
+            "agentProgress": 0.2
         })
+        await progress_tracker.flush(job_id)
 
         # ========================================================================
         # STEP 2: CALCULATE TARGET ACHIEVABLE
+        # Nothing up to the research context depends on the search results, so
+        # it is prepared while the requests are in flight
         # ========================================================================
         target_achievable = offer_price <= target_price if offer_price and target_price else False
 
-        # Map value_assessment to confidence
-        confidence_map = {
-            "urgent": "High",
-            "high_impact": "High",
-            "medium_impact": "Medium",
-            "low_impact": "Low"
-        }
-        confidence = confidence_map.get(value_assessment, "Medium")
-
-        # Map value_assessment to partnership recommendation
-        partnership_map = {
-            "urgent": "Strategic Partner",
-            "high_impact": "Strategic Partner",
-            "medium_impact": "Preferred Vendor",
-            "low_impact": "Transactional"
-        }
-        partnership_recommendation = partnership_map.get(value_assessment, "Preferred Vendor")
-
-        # ========================================================================
-        # STEP 3: GPT ANALYSIS
-        # ========================================================================
-
-        # Build research context
-        research_context = ""
-        for key, result in search_results.items():
-            if result.get("success"):
-                research_context += f"\n\n{key.upper()}:\n{result['content'][:500]}"
+        # Map value_assessment to confidence and partnership recommendation
+        confidence = CONFIDENCE_MAP.get(value_assessment, "Medium")
+        partnership_recommendation = PARTNERSHIP_MAP.get(value_assessment, "Preferred Vendor")
 
         # Get market analysis and offer analysis results
         # Note: This agent runs after market_analysis and offer_analysis have completed,
@@ -175,49 +319,32 @@ async def outcome_assessment_node(state: NegotiationState, config: RunnableConfi
         completeness_score = offer_analysis.get("completeness_score", 5)
         key_risks = market_analysis.get("key_risks", [])
 
-        # Create analysis prompt
-        analysis_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a strategic negotiation advisor. Based on the research and analysis, provide:
-
-1. Negotiation Leverage: List 3-5 specific leverage points based on alternatives, gaps, market position, urgency
-2. Recommended Tactics: Provide 3-5 concrete tactical tips for this specific negotiation
-
-Be specific and actionable. Focus on what gives the buyer power in this negotiation."""),
-            ("user", """Supplier: {supplier_name}
-Target Achievable: {target_achievable}
-Confidence: {confidence}
-
-Pricing:
-- Offer: {offer_price}
-- Target: {target_price}
-- Max: {max_price}
-
-Offer Completeness Score: {completeness_score}/10
+        if not settings.llm_batching_enabled:
+            leverage_chain = get_chain(LEVERAGE_PROMPT, temperature=0.4)
+            tactics_chain = get_chain(TACTICS_PROMPT, temperature=0.4)
 
-Alternatives: {alternatives_overview}
-
-Key Risks: {key_risks}
+        search_results = await search_task
 
-Industry Research:
-{research_context}
+        progress_tracker.publish_background(job_id, {
+            "agent": "outcome_assessment",
+            "status": "running",
+            "message": "Research complete, building strategy...",
+            "detail": "Generating negotiation recommendations",
+            "progress": 0.25,
+            "agentProgress": 0.5
+        })
 
-Provide your analysis in this exact format:
-LEVERAGE 1: [specific leverage point]
-LEVERAGE 2: [specific leverage point]
-LEVERAGE 3: [specific leverage point]
-LEVERAGE 4: [specific leverage point]
-LEVERAGE 5: [specific leverage point]
-TACTIC 1: [specific tactic]
-TACTIC 2: [specific tactic]
-TACTIC 3: [specific tactic]
-TACTIC 4: [specific tactic]
-TACTIC 5: [specific tactic]""")
-        ])
+        # ========================================================================
+        # STEP 3: GPT ANALYSIS
+        # ========================================================================
 
-        llm = get_llm(temperature=0.4)
-        chain = analysis_prompt | llm
+        # Build research context
+        research_context = ""
+        for key, result in search_results.items():
+            if result.get("success"):
+                research_context += f"\n\n{key.upper()}:\n{truncate_tokens(result['content'], RESEARCH_SNIPPET_TOKENS)}"
 
-        response = await chain.ainvoke({
+        analysis_inputs = {
             "supplier_name": supplier_name,
             "target_achievable": "Yes" if target_achievable else "No",
             "confidence": confidence,
@@ -228,31 +355,39 @@ TACTIC 5: [specific tactic]""")
             "alternatives_overview": alternatives_overview,
             "key_risks": ", ".join(key_risks) if key_risks else "None identified",
             "research_context": research_context
-        })
+        }
 
-        # Parse GPT response
-        response_text = response.content
+        if settings.llm_batching_enabled:
+            # Bulk runs: share a provider request window with other in-flight jobs
+            responses = await asyncio.gather(
+                leverage_batcher.submit(analysis_inputs),
+                tactics_batcher.submit(analysis_inputs)
+            )
+            response_texts = [response.content for response in responses]
+        else:
+            # Stream so each leverage point and tactic shows up in the UI as it is written
+            points_reported = {"count": 0}
+            response_texts = await asyncio.gather(
+                stream_points(leverage_chain, analysis_inputs, job_id, points_reported),
+                stream_points(tactics_chain, analysis_inputs, job_id, points_reported)
+            )
+
+        # Parse GPT responses (LEVERAGE and TACTIC lines from both)
+        response_text = "\n".join(response_texts)
 
         # Extract leverage points and tactics
         negotiation_leverage = []
         recommended_tactics = []
 
-        lines = response_text.split("\n")
-        for line in lines:
-            line = line.strip()
-            if line.startswith("LEVERAGE"):
-                leverage_text = line.split(":", 1)[1].strip() if ":" in line else line
-                negotiation_leverage.append(leverage_text)
-            elif line.startswith("TACTIC"):
-                tactic_text = line.split(":", 1)[1].strip() if ":" in line else line
-                recommended_tactics.append(tactic_text)
+        for kind, point in _POINT_RE.findall(response_text):
+            (negotiation_leverage if kind == "LEVERAGE" else recommended_tactics).append(point)
 
         # Ensure we have at least 3 of each
         if not negotiation_leverage:
-            negotiation_leverage = ["Multiple alternatives available", "Gaps in offer provide leverage", "Market competition"]
+            negotiation_leverage = list(_DEFAULT_LEVERAGE)
 
         if not recommended_tactics:
-            recommended_tactics = ["Highlight offer gaps", "Reference alternatives", "Emphasize value assessment"]
+            recommended_tactics = list(_DEFAULT_TACTICS)
 
         # Clamp to 3-5 items
         negotiation_leverage = negotiation_leverage[:5]
@@ -282,7 +417,7 @@ TACTIC 5: [specific tactic]""")
 
         # Return ONLY the keys this agent updates
         return {
-            "outcome_assessment": outcome_assessment.dict(),
+            "outcome_assessment": outcome_assessment.model_dump(),
             "agent_progress": {"outcome_assessment": 1.0}
         }
 
@@ -290,7 +425,13 @@ TACTIC 5: [specific tactic]""")
         error_msg = f"Outcome assessment error: {str(e)}"
         logger.error(f"[OUTCOME_ASSESSMENT] {error_msg}", exc_info=True)
 
-        await progress_tracker.publish(job_id, {
+        # Don't leave the research requests running (or their errors unretrieved)
+        if search_task is not None:
+            search_task.cancel()
+            await asyncio.gather(search_task, return_exceptions=True)
+
+        # Terminal: sent immediately, discarding any streamed update still waiting
+        progress_tracker.publish_throttled(job_id, {
             "agent": "outcome_assessment",
             "status": "error",
             "message": "Outcome assessment failed",
@@ -8,20 +8,45 @@ Responsibilities:
 """
 
 import logging
-from typing import List
+from typing import List, Optional
 from langchain_core.runnables import RunnableConfig
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 
 from app.agents.state import NegotiationState
-from app.agents.schemas import ParsedInput, FormData, AlternativeSupplier
-from app.utils.llm import get_llm
+from app.agents.schemas import ParsedInput, FormData, AlternativeSupplier, AlternativeSupplierList
+from app.utils.llm import get_structured_chain
+from app.utils.prompt_compress import normalize_head, token_char_bound, truncate_tokens, content_chars
 from app.services.progress_tracker import get_progress_tracker
 
 logger = logging.getLogger(__name__)
 progress_tracker = get_progress_tracker()
 
 
+# ============================================================================
+# PROMPTS - compiled once at import; the static system message comes first and
+# the document text last
+# ============================================================================
+# Tokens of the alternatives document sent to the LLM (supplier lists come early;
+# about the 4000 characters previously sent for English text, but bounded for dense scripts)
+ALTERNATIVES_MAX_TOKENS = 1000
+
+# Shorter alternatives text cannot name a supplier (empty or failed PDF text layer)
+ALTERNATIVES_MIN_CHARS = 20
+
+ALTERNATIVES_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert at extracting structured information from documents.
+Extract a list of alternative suppliers from the provided text.
+
+For each supplier, extract:
+- name (required): The company name
+- description (optional): What product/service they offer
+- contact (optional): Email, phone, or website
+
+If the document doesn't contain any supplier information, return an empty list."""),
+    ("user", "Document text:\n\n{text}")
+])
+
+
 async def parse_node(state: NegotiationState, config: RunnableConfig) -> NegotiationState:
     """
     Parse and validate all inputs.
@@ -43,7 +68,7 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
     logger.info(f"[PARSE] Starting parse node for job_id={job_id}")
 
     # Publish progress event
-    await progress_tracker.publish(job_id, {
+    progress_tracker.publish_background(job_id, {
         "agent": "parse",
         "status": "running",
         "message": "Starting input validation...",
@@ -54,38 +79,27 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
     # ========================================================================
     # STEP 1: VALIDATE REQUIRED INPUTS (3 document types)
     # ========================================================================
-    if not state.get("supplier_offer_pdf"):
-        error_msg = "Missing supplier offer PDF text"
-        logger.error(f"[PARSE] {error_msg}")
-        state["errors"].append(error_msg)
-        await progress_tracker.publish(job_id, {
-            "agent": "parse",
-            "status": "error",
-            "message": error_msg,
-            "progress": 0.1
-        })
-        return state
-
-    if not state.get("initial_request_pdf"):
-        error_msg = "Missing initial request PDF text"
-        logger.error(f"[PARSE] {error_msg}")
-        state["errors"].append(error_msg)
-        await progress_tracker.publish(job_id, {
-            "agent": "parse",
-            "status": "error",
-            "message": error_msg,
-            "progress": 0.1
-        })
-        return state
-
-    if not state.get("form_data"):
-        error_msg = "Missing form data"
-        logger.error(f"[PARSE] {error_msg}")
-        state["errors"].append(error_msg)
-        await progress_tracker.publish(job_id, {
+    # Whitespace-only text is as good as missing; isspace() checks it without
+    # copying the (possibly multi-MB) document the way strip() would
+    supplier_offer_pdf = state.get("supplier_offer_pdf") or ""
+    initial_request_pdf = state.get("initial_request_pdf") or ""
+    validation_errors = [
+        error_msg
+        for missing, error_msg in (
+            (not supplier_offer_pdf or supplier_offer_pdf.isspace(), "Missing supplier offer PDF text"),
+            (not initial_request_pdf or initial_request_pdf.isspace(), "Missing initial request PDF text"),
+            (not state.get("form_data"), "Missing form data"),
+        )
+        if missing
+    ]
+
+    if validation_errors:
+        logger.error(f"[PARSE] Validation errors: {validation_errors}")
+        state["errors"].extend(validation_errors)
+        progress_tracker.publish_background(job_id, {
             "agent": "parse",
             "status": "error",
-            "message": error_msg,
+            "message": "; ".join(validation_errors),
             "progress": 0.1
         })
         return state
@@ -97,7 +111,7 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
         error_msg = f"Invalid form data: {str(e)}"
         logger.error(f"[PARSE] {error_msg}")
         state["errors"].append(error_msg)
-        await progress_tracker.publish(job_id, {
+        progress_tracker.publish_background(job_id, {
             "agent": "parse",
             "status": "error",
             "message": error_msg,
@@ -107,7 +121,7 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
 
     logger.info(f"[PARSE] Inputs validated successfully")
 
-    await progress_tracker.publish(job_id, {
+    progress_tracker.publish_background(job_id, {
         "agent": "parse",
         "status": "running",
         "message": "Validation complete",
@@ -122,7 +136,7 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
 
     if state.get("alternatives_pdf"):
         logger.info(f"[PARSE] Extracting alternatives from PDF")
-        await progress_tracker.publish(job_id, {
+        progress_tracker.publish_background(job_id, {
             "agent": "parse",
             "status": "running",
             "message": "Analyzing alternatives document...",
@@ -131,9 +145,9 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
         })
 
         try:
-            alternatives = await extract_alternatives_from_pdf(state["alternatives_pdf"])
+            alternatives = await extract_alternatives_from_pdf(state["alternatives_pdf"], job_id=job_id)
             logger.info(f"[PARSE] Extracted {len(alternatives)} alternative suppliers")
-            await progress_tracker.publish(job_id, {
+            progress_tracker.publish_throttled(job_id, {
                 "agent": "parse",
                 "status": "running",
                 "message": f"Found {len(alternatives)} alternative suppliers",
@@ -150,7 +164,7 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
     # ========================================================================
     # STEP 3: BUILD PARSED INPUT
     # ========================================================================
-    await progress_tracker.publish(job_id, {
+    progress_tracker.publish_throttled(job_id, {
         "agent": "parse",
         "status": "running",
         "message": "Building structured data...",
@@ -158,16 +172,16 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
         "progress": 0.13
     })
 
-    parsed_input = ParsedInput(
-        supplier_offer_text=state["supplier_offer_pdf"],
-        initial_request_text=state["initial_request_pdf"],
-        alternatives_text=state.get("alternatives_pdf"),  # Store full PDF text for agent analysis
+    # Every field is already validated (form_data above, alternatives by structured
+    # output), so skip a second validation pass. The PDF texts stay in their state
+    # keys only - copying them here would double every checkpoint
+    parsed_input = ParsedInput.model_construct(
         alternatives=alternatives,  # Store structured list of suppliers
         form_data=form_data
     )
 
     # Update state
-    state["parsed_input"] = parsed_input.dict()
+    state["parsed_input"] = parsed_input.model_dump()
     state["current_agent"] = "parse"
     state["progress"] = 0.15
 
@@ -183,57 +197,59 @@ async def parse_node(state: NegotiationState, config: RunnableConfig) -> Negotia
     return state
 
 
-async def extract_alternatives_from_pdf(pdf_text: str) -> List[AlternativeSupplier]:
+async def extract_alternatives_from_pdf(
+    pdf_text: str,
+    max_tokens: int = ALTERNATIVES_MAX_TOKENS,
+    job_id: Optional[str] = None
+) -> List[AlternativeSupplier]:
     """
     Extract structured list of alternative suppliers from PDF text.
 
-    Uses LLM with temperature=0 for deterministic extraction.
+    Uses LLM with temperature=0 for deterministic extraction. The response is
+    streamed: the structured-output parser yields a progressively more complete
+    AlternativeSupplierList, and each supplier is reported as soon as the next
+    one starts (i.e. once its own fields are complete).
 
     Args:
         pdf_text: Raw text from alternatives PDF
+        max_tokens: Maximum tokens of pdf_text sent to the LLM (text that fits is passed through uncopied)
+        job_id: Job ID for per-supplier progress events (optional)
 
     Returns:
         List of AlternativeSupplier objects
     """
-    logger.info("[PARSE] Starting LLM-based alternatives extraction")
-
-    # Define parser
-    parser = PydanticOutputParser(pydantic_object=List[AlternativeSupplier])
-
-    # Build prompt
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an expert at extracting structured information from documents.
-Extract a list of alternative suppliers from the provided text.
-
-For each supplier, extract:
-- name (required): The company name
-- description (optional): What product/service they offer
-- contact (optional): Email, phone, or website
-
-{format_instructions}
-
-If the document doesn't contain any supplier information, return an empty list."""),
-        ("user", "Document text:\n\n{text}")
-    ])
+    if content_chars(pdf_text, ALTERNATIVES_MIN_CHARS) < ALTERNATIVES_MIN_CHARS:
+        logger.warning("[PARSE] Alternatives document contains almost no text, skipping LLM extraction")
+        return []
 
-    # Get LLM with temperature=0 for deterministic extraction
-    llm = get_llm(temperature=0.0)
+    logger.info("[PARSE] Starting LLM-based alternatives extraction")
 
-    # Build chain
-    chain = prompt | llm | parser
+    # Get LLM with temperature=0 for deterministic extraction; function calling
+    # returns arguments that already match AlternativeSupplierList, so the schema
+    # no longer has to be echoed in the prompt (the chain is cached per loop)
+    chain = get_structured_chain(ALTERNATIVES_PROMPT, AlternativeSupplierList, temperature=0.0)
 
     # Execute
     try:
-        result = await chain.ainvoke({
-            "text": pdf_text[:4000],  # Limit text length to avoid token limits
-            "format_instructions": parser.get_format_instructions()
-        })
-
-        # Handle both list and single object returns
-        if isinstance(result, list):
-            return result
-        else:
-            return [result] if result else []
+        result = None
+        suppliers_reported = 0
+        async for partial in chain.astream({
+            "text": truncate_tokens(normalize_head(pdf_text, token_char_bound(max_tokens)), max_tokens)  # Limit text length to avoid token limits
+        }):
+            result = partial
+            # The last supplier in a partial result may still be streaming
+            while job_id and suppliers_reported < len(partial.suppliers) - 1:
+                supplier = partial.suppliers[suppliers_reported]
+                suppliers_reported += 1
+                progress_tracker.publish_throttled(job_id, {
+                    "agent": "parse",
+                    "status": "running",
+                    "message": f"Found alternative supplier {suppliers_reported}",
+                    "detail": supplier.name,
+                    "progress": 0.11
+                })
+
+        return result.suppliers if result else []
 
     except Exception as e:
         logger.error(f"[PARSE] LLM extraction failed: {str(e)}")
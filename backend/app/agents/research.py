@@ -0,0 +1,137 @@
+"""
+Research Agent - Shared Perplexity research, run once per job after parse.
+
+Responsibilities:
+1. Run product-type research that does not depend on other agents' outputs
+2. Store results in state["research_context"] keyed by product_type so every
+   agent reads the same content instead of issuing its own Perplexity call
+3. Run the market and offer analysis queries as one batch and store them in
+   state["research_results"] for the combined analysis node to read
+"""
+
+import asyncio
+import logging
+from langchain_core.runnables import RunnableConfig
+
+from app.agents.state import NegotiationState
+from app.agents import combined_analysis
+from app.utils.perplexity import cached_perplexity_search, cached_perplexity_batch_search
+from app.config import get_settings
+from app.services.progress_tracker import get_progress_tracker
+
+logger = logging.getLogger(__name__)
+progress_tracker = get_progress_tracker()
+
+
+async def research_node(state: NegotiationState, config: RunnableConfig) -> NegotiationState:
+    """
+    Run all product-type and analysis research for the job.
+
+    Only depends on parsed_input, so it runs alongside supplier_summary. The
+    market and offer queries go out in a single batch (one cache pass, one
+    embedding call); the combined analysis starts once it returns. Progress is
+    reported under the agents that consume each part of the research.
+
+    Args:
+        state: Current negotiation state
+        config: Runnable config
+
+    Returns:
+        Updated state with research_context[product_type] and research_results populated
+    """
+    job_id = state["job_id"]
+    settings = get_settings()
+
+    logger.info(f"[RESEARCH] Starting for job_id={job_id}")
+
+    parsed_input = state.get("parsed_input")
+    if not parsed_input:
+        # Consumers report the missing input; research is best-effort
+        logger.warning(f"[RESEARCH] Skipping research: missing parsed_input")
+        return {"research_context": {}, "research_results": {}}
+
+    try:
+        product_type = parsed_input["form_data"]["product_type"]
+        supplier_name = parsed_input["form_data"]["supplier_name"]
+
+        progress_tracker.publish_background(job_id, {
+            "agent": "market_analysis",
+            "status": "running",
+            "message": "Researching alternatives and pricing...",
+            "detail": f"Comparing {supplier_name} to market",
+            "progress": 0.18,
+            "agentProgress": 0.2
+        })
+        progress_tracker.publish_background(job_id, {
+            "agent": "offer_analysis",
+            "status": "running",
+            "message": "Researching industry standards...",
+            "detail": f"Looking up typical {product_type} terms",
+            "progress": 0.18,
+            "agentProgress": 0.2
+        })
+        progress_tracker.publish_background(job_id, {
+            "agent": "action_items",
+            "status": "running",
+            "message": "Researching best practices...",
+            "detail": f"Looking up {product_type} negotiation checklists",
+            "progress": 0.18,
+            "agentProgress": 0.2
+        })
+
+        # Analysis queries carry market_/offer_ key prefixes to split the results afterwards
+        analysis_queries = combined_analysis.build_research_queries(parsed_input)
+
+        # Ask for a short checklist up front rather than truncating a long answer afterwards.
+        # Uses "sonar": reasoning traces would count against max_tokens.
+        search_result, research_results = await asyncio.gather(
+            cached_perplexity_search(
+                query=f'contract negotiation action items checklist {product_type} procurement',
+                system_prompt=(
+                    "Provide a checklist of important action items for contract negotiations. "
+                    "Answer with at most 8 concise bullet points and nothing else."
+                ),
+                api_key=settings.perplexity_api_key,
+                model="sonar",
+                max_tokens=250
+            ),
+            cached_perplexity_batch_search(
+                queries=analysis_queries,
+                api_key=settings.perplexity_api_key,
+                model="sonar-reasoning"
+            )
+        )
+
+        research_content = search_result.get("content", "") if search_result.get("success") else ""
+
+        progress_tracker.publish_background(job_id, {
+            "agent": "action_items",
+            "status": "running",
+            "message": "Research complete, waiting for analysis...",
+            "detail": "Best practices ready for action planning",
+            "progress": 0.25,
+            "agentProgress": 0.4
+        })
+
+        # Return ONLY the keys this node updates
+        return {
+            "research_context": {product_type: research_content},
+            "research_results": research_results
+        }
+
+    except Exception as e:
+        error_msg = f"Research error: {str(e)}"
+        logger.error(f"[RESEARCH] {error_msg}", exc_info=True)
+
+        # Not terminal - the consuming agents continue without research
+        progress_tracker.publish_background(job_id, {
+            "agent": "action_items",
+            "status": "running",
+            "message": "Research unavailable, continuing without it",
+            "detail": error_msg,
+            "progress": 0.25,
+            "agentProgress": 0.4
+        })
+
+        # Research is best-effort: consumers fall back to analysis without it
+        return {"research_context": {}, "research_results": {}}
@@ -7,10 +7,26 @@ This module defines all structured data models used throughout the pipeline:
 - Sub-models for complex nested structures
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Literal
 
 
+# ============================================================================
+# BASE MODEL
+# ============================================================================
+
+class FrozenModel(BaseModel):
+    """
+    Base for node output models.
+
+    Outputs are built once, dumped into state and never mutated, so they are
+    frozen; extra fields keep the default "ignore" so LLM tool output carrying
+    an unexpected key still validates.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+
 # ============================================================================
 # INPUT MODELS
 # ============================================================================
@@ -39,19 +55,28 @@ class AlternativeSupplier(BaseModel):
     contact: Optional[str] = Field(default=None, description="Contact information")
 
 
+class AlternativeSupplierList(BaseModel):
+    """Wrapper for LLM extraction of alternative suppliers (structured output needs a model, not a bare list)."""
+
+    suppliers: List[AlternativeSupplier] = Field(
+        default_factory=list,
+        description="Alternative suppliers found in the document"
+    )
+
+
 # ============================================================================
 # PARSE NODE OUTPUT
 # ============================================================================
 
 class ParsedInput(BaseModel):
-    """Output from the parse node - validated and structured inputs."""
+    """
+    Output from the parse node - validated and structured inputs.
+
+    The PDF texts are not copied in: agents read them from the state keys
+    (supplier_offer_pdf, initial_request_pdf, alternatives_pdf), so each
+    document is held and checkpointed once.
+    """
 
-    supplier_offer_text: str = Field(description="Full text from supplier offer PDF (contains pricing = max price)")
-    initial_request_text: str = Field(description="Full text from initial request PDF (what we're looking for)")
-    alternatives_text: Optional[str] = Field(
-        default=None,
-        description="Full text from alternatives PDF (raw text for agent analysis)"
-    )
     alternatives: List[AlternativeSupplier] = Field(
         default_factory=list,
         description="List of alternative suppliers extracted from PDF (structured data)"
@@ -63,7 +88,7 @@ class ParsedInput(BaseModel):
 # SHARED MODELS
 # ============================================================================
 
-class CompanyOverview(BaseModel):
+class CompanyOverview(FrozenModel):
     """Overview of a company from web research."""
 
     description: str = Field(description="Company description and business overview")
@@ -76,7 +101,7 @@ class CompanyOverview(BaseModel):
 # PARALLEL AGENT OUTPUTS
 # ============================================================================
 
-class SupplierSummary(BaseModel):
+class SupplierSummary(FrozenModel):
     """Section 1: Summary of the supplier being negotiated with."""
 
     company_overview: CompanyOverview = Field(description="Company profile")
@@ -85,7 +110,7 @@ class SupplierSummary(BaseModel):
     contact_info: str = Field(description="Contact information")
 
 
-class MarketAnalysis(BaseModel):
+class MarketAnalysis(FrozenModel):
     """Section 2: Market analysis including alternatives and positioning."""
 
     alternatives_overview: str = Field(
@@ -100,7 +125,7 @@ class MarketAnalysis(BaseModel):
     )
 
 
-class OfferAnalysis(BaseModel):
+class OfferAnalysis(FrozenModel):
     """Section 3: Analysis of the supplier's offer."""
 
     completeness_score: int = Field(
@@ -119,7 +144,18 @@ class OfferAnalysis(BaseModel):
     )
 
 
-class OutcomeAssessment(BaseModel):
+class CombinedAnalysis(FrozenModel):
+    """Sections 2 and 3 returned by one structured call."""
+
+    market_analysis: MarketAnalysis = Field(
+        description="Market analysis including alternatives and positioning"
+    )
+    offer_analysis: OfferAnalysis = Field(
+        description="Analysis of the supplier's offer"
+    )
+
+
+class OutcomeAssessment(FrozenModel):
     """Section 4: Assessment of negotiation outcomes and strategy."""
 
     target_achievable: bool = Field(
@@ -141,7 +177,7 @@ class OutcomeAssessment(BaseModel):
     )
 
 
-class ActionItem(BaseModel):
+class ActionItem(FrozenModel):
     """Individual action item for the negotiation."""
 
     category: Literal["price", "terms", "timeline", "scope"] = Field(
@@ -154,7 +190,7 @@ class ActionItem(BaseModel):
     )
 
 
-class ActionItemsList(BaseModel):
+class ActionItemsList(FrozenModel):
     """Output from the action_items agent - exactly 5 prioritized action items."""
 
     items: List[ActionItem] = Field(
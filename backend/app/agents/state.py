@@ -35,10 +35,16 @@ class NegotiationState(TypedDict):
     # ========================================================================
     parsed_input: Optional[Dict[str, Any]]  # Output from parse node (ParsedInput schema)
 
+    # Shared research, fetched once by the research node {product_type: content}
+    research_context: Annotated[Dict[str, str], merge_dicts]
+
+    # Shared analysis research, batched by the research node {prefixed_key: perplexity_result}
+    research_results: Optional[Dict[str, Dict[str, Any]]]
+
     # Parallel agent outputs - each agent has exclusive write access to its own field
     supplier_summary: Optional[Dict[str, Any]]  # Output from supplier_summary agent
-    market_analysis: Optional[Dict[str, Any]]  # Output from market_analysis agent
-    offer_analysis: Optional[Dict[str, Any]]  # Output from offer_analysis agent
+    market_analysis: Optional[Dict[str, Any]]  # Output from combined_analysis agent (market section)
+    offer_analysis: Optional[Dict[str, Any]]  # Output from combined_analysis agent (offer section)
     outcome_assessment: Optional[Dict[str, Any]]  # Output from outcome_assessment agent
     action_items: Optional[Dict[str, Any]]  # Output from action_items agent (separate from briefing)
 
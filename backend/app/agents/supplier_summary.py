@@ -7,6 +7,7 @@ Responsibilities:
 3. Generate SupplierSummary schema output
 """
 
+import asyncio
 import logging
 from langchain_core.runnables import RunnableConfig
 from langchain.prompts import ChatPromptTemplate
@@ -22,6 +23,87 @@ logger = logging.getLogger(__name__)
 progress_tracker = get_progress_tracker()
 
 
+# ============================================================================
+# PROMPTS - compiled once at import and reused by every job
+# ============================================================================
+SYNTHESIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a business intelligence analyst. Synthesize the research into a structured company profile.
+
+Extract and provide:
+1. Company Description: A clear 2-3 sentence overview
+2. Company Size: Number of employees or size category (e.g., "50-200 employees", "Enterprise")
+3. Location: Headquarters location (city, country)
+4. Industry: Primary industry or sector
+5. Key Facts: Exactly 5 important facts about the company
+6. Recent News: Exactly 3 most recent/relevant news items
+7. Contact Info: Official contact information
+
+Be concise and factual. If information is not available, say "Not available" instead of making assumptions."""),
+    ("user", """Company Name: {supplier_name}
+
+Research Results:
+{research_context}
+
+User-Provided Contact: {supplier_contact}
+
+Provide your analysis in this exact format:
+
+DESCRIPTION: [2-3 sentences]
+SIZE: [employee count or category]
+LOCATION: [city, country]
+INDUSTRY: [primary industry]
+FACT 1: [important fact]
+FACT 2: [important fact]
+FACT 3: [important fact]
+FACT 4: [important fact]
+FACT 5: [important fact]
+NEWS 1: [recent news item]
+NEWS 2: [recent news item]
+NEWS 3: [recent news item]
+CONTACT: [official contact information]""")
+])
+
+# Labelled lines requested by SYNTHESIS_PROMPT (DESCRIPTION through CONTACT)
+SYNTHESIS_FIELD_COUNT = 13
+
+
+async def stream_synthesis(chain, inputs: dict, job_id: str) -> str:
+    """
+    Stream the GPT synthesis, publishing progress as each labelled line completes.
+
+    Args:
+        chain: SYNTHESIS_PROMPT | llm
+        inputs: Prompt variables
+        job_id: Job ID for progress events
+
+    Returns:
+        Full response text
+    """
+    response_text = ""
+    fields_reported = 0
+
+    async for chunk in chain.astream(inputs):
+        response_text += chunk.content
+        # A field line can only have completed if a newline just arrived
+        if "\n" not in chunk.content:
+            continue
+
+        completed_lines = [line.strip() for line in response_text.split("\n")[:-1] if ":" in line]
+        while fields_reported < min(len(completed_lines), SYNTHESIS_FIELD_COUNT):
+            label, value = completed_lines[fields_reported].split(":", 1)
+            fields_reported += 1
+            progress_tracker.publish_throttled(job_id, {
+                "agent": "supplier_summary",
+                "status": "running",
+                "message": f"Synthesizing profile ({fields_reported}/{SYNTHESIS_FIELD_COUNT})",
+                "detail": f"{label.title()}: {value.strip()}",
+                "progress": 0.25 + 0.1 * fields_reported / SYNTHESIS_FIELD_COUNT,
+                "agentProgress": 0.5 + 0.4 * fields_reported / SYNTHESIS_FIELD_COUNT
+            })
+
+    return response_text
+
+
 async def supplier_summary_node(state: NegotiationState, config: RunnableConfig) -> NegotiationState:
     """
     Gather supplier intelligence using Perplexity research.
@@ -45,7 +127,7 @@ async def supplier_summary_node(state: NegotiationState, config: RunnableConfig)
     logger.info(f"[SUPPLIER_SUMMARY] Starting for job_id={job_id}")
 
     # Publish initial progress
-    await progress_tracker.publish(job_id, {
+    progress_tracker.publish_background(job_id, {
         "agent": "supplier_summary",
         "status": "running",
         "message": "Starting supplier research...",
@@ -54,10 +136,6 @@ async def supplier_summary_node(state: NegotiationState, config: RunnableConfig)
         "agentProgress": 0.0
     })
 
-    # Small delay to ensure SSE sends the message before blocking on Perplexity
-    import asyncio
-    await asyncio.sleep(0.1)
-
     try:
         # Extract parsed input
         parsed_input = state.get("parsed_input")
@@ -75,7 +153,7 @@ async def supplier_summary_node(state: NegotiationState, config: RunnableConfig)
         # ========================================================================
         # STEP 1: PERPLEXITY RESEARCH
         # ========================================================================
-        await progress_tracker.publish(job_id, {
+        progress_tracker.publish_background(job_id, {
             "agent": "supplier_summary",
             "status": "running",
             "message": "Researching company profile...",
@@ -88,34 +166,48 @@ async def supplier_summary_node(state: NegotiationState, config: RunnableConfig)
         queries = [
             {
                 "key": "company_profile",
-                "query": f'"{supplier_name}" company overview about us',
+                "template_id": "company_profile",
+                "params": {"supplier": supplier_name},
                 "system_prompt": "You are a business research assistant. Provide comprehensive company information."
             },
             {
                 "key": "linkedin",
-                "query": f"{supplier_name} site:linkedin.com",
+                "template_id": "linkedin",
+                "params": {"supplier": supplier_name},
                 "system_prompt": "Extract company size, location, and industry from LinkedIn profile."
             },
             {
                 "key": "recent_news",
-                "query": f'"{supplier_name}" news 2024 OR 2025',
+                "template_id": "recent_news",
+                "params": {"supplier": supplier_name},
                 "system_prompt": "Summarize the most recent and relevant news about this company."
             },
             {
                 "key": "contact",
-                "query": f"{supplier_name} contact information email phone",
+                "template_id": "contact",
+                "params": {"supplier": supplier_name},
                 "system_prompt": "Find official contact information for this company."
             }
         ]
 
-        # Execute all queries in parallel
-        search_results = await perplexity_batch_search(
+        # Start the searches first, then let SSE deliver the queued events while
+        # they are in flight instead of delaying the requests behind the flush
+        search_task = asyncio.create_task(perplexity_batch_search(
             queries=queries,
             api_key=settings.perplexity_api_key,
             model="sonar-reasoning"
-        )
+        ))
+        await progress_tracker.flush(job_id)
 
-        await progress_tracker.publish(job_id, {
+        # The synthesis chain doesn't depend on the results - build it while the
+        # requests are in flight. Field extraction from research text - the fast
+        # tier is sufficient
+        llm = get_llm(temperature=0.3, tier="fast")
+        chain = SYNTHESIS_PROMPT | llm
+
+        search_results = await search_task
+
+        progress_tracker.publish_background(job_id, {
             "agent": "supplier_summary",
             "status": "running",
             "message": "Research complete, synthesizing with GPT...",
@@ -134,55 +226,18 @@ async def supplier_summary_node(state: NegotiationState, config: RunnableConfig)
             if result.get("success"):
                 research_context += f"\n\n{key.upper()}:\n{result['content'][:800]}"
 
-        # Create synthesis prompt
-        synthesis_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a business intelligence analyst. Synthesize the research into a structured company profile.
-
-Extract and provide:
-1. Company Description: A clear 2-3 sentence overview
-2. Company Size: Number of employees or size category (e.g., "50-200 employees", "Enterprise")
-3. Location: Headquarters location (city, country)
-4. Industry: Primary industry or sector
-5. Key Facts: Exactly 5 important facts about the company
-6. Recent News: Exactly 3 most recent/relevant news items
-7. Contact Info: Official contact information
-
-Be concise and factual. If information is not available, say "Not available" instead of making assumptions."""),
-            ("user", """Company Name: {supplier_name}
-
-Research Results:
-{research_context}
-
-User-Provided Contact: {supplier_contact}
-
-Provide your analysis in this exact format:
-
-DESCRIPTION: [2-3 sentences]
-SIZE: [employee count or category]
-LOCATION: [city, country]
-INDUSTRY: [primary industry]
-FACT 1: [important fact]
-FACT 2: [important fact]
-FACT 3: [important fact]
-FACT 4: [important fact]
-FACT 5: [important fact]
-NEWS 1: [recent news item]
-NEWS 2: [recent news item]
-NEWS 3: [recent news item]
-CONTACT: [official contact information]""")
-        ])
-
-        llm = get_llm(temperature=0.3)
-        chain = synthesis_prompt | llm
-
-        response = await chain.ainvoke({
-            "supplier_name": supplier_name,
-            "research_context": research_context,
-            "supplier_contact": supplier_contact or "Not provided"
-        })
-
-        # Parse GPT response
-        response_text = response.content
+        if research_context.strip():
+            # Stream so the profile fields show up in the UI as they are written
+            response_text = await stream_synthesis(chain, {
+                "supplier_name": supplier_name,
+                "research_context": research_context,
+                "supplier_contact": supplier_contact or "Not provided"
+            }, job_id)
+        else:
+            # No research came back - GPT could only invent a profile, so skip the
+            # call and let the parser below fill in the "not available" defaults
+            logger.warning(f"[SUPPLIER_SUMMARY] No research results for {supplier_name}, skipping GPT synthesis")
+            response_text = ""
 
         # Extract structured data
         description = "No description available"
@@ -262,7 +317,7 @@ CONTACT: [official contact information]""")
 
         # Return ONLY the keys this agent updates (for parallel execution)
         return {
-            "supplier_summary": supplier_summary.dict(),
+            "supplier_summary": supplier_summary.model_dump(),
             "agent_progress": {"supplier_summary": 1.0}
         }
 
@@ -5,11 +5,14 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
-import json
 from app.services.elevenlabs_service import get_elevenlabs_service
+from app.utils.sse import sse_frame
 
 router = APIRouter()
 
+# Insight types accepted by the analyze endpoints
+VALID_ACTION_TYPES = frozenset({"arguments", "outcome"})
+
 
 class ConnectResponse(BaseModel):
     """Response model for connect endpoint."""
@@ -238,7 +241,7 @@ async def analyze_conversation(request: AnalyzeRequest):
     from app.services.vector_store import stream_action_insights
     
     # Validate action type
-    if request.actionType not in ["arguments", "outcome"]:
+    if request.actionType not in VALID_ACTION_TYPES:
         raise HTTPException(
             status_code=400, 
             detail="actionType must be 'arguments' or 'outcome'"
@@ -260,7 +263,7 @@ async def analyze_conversation(request: AnalyzeRequest):
         """Generate SSE events with insight chunks."""
         try:
             # Send start event
-            yield f"data: {json.dumps({'type': 'start', 'actionType': request.actionType})}\n\n"
+            yield sse_frame({"type": "start", "actionType": request.actionType})
             
             # Stream the insights
             full_response = ""
@@ -271,14 +274,14 @@ async def analyze_conversation(request: AnalyzeRequest):
                 goals=request.goals
             ):
                 full_response += chunk
-                yield f"data: {json.dumps({'type': 'chunk', 'content': chunk})}\n\n"
+                yield sse_frame({"type": "chunk", "content": chunk})
             
             # Send complete event
-            yield f"data: {json.dumps({'type': 'complete', 'content': full_response})}\n\n"
+            yield sse_frame({"type": "complete", "content": full_response})
             
         except Exception as e:
             # Send error event
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield sse_frame({"type": "error", "message": str(e)})
     
     return StreamingResponse(
         event_generator(),
@@ -307,7 +310,7 @@ async def analyze_conversation_sync(request: AnalyzeRequest):
     from app.services.vector_store import query_for_action_insights
     
     # Validate action type
-    if request.actionType not in ["arguments", "outcome"]:
+    if request.actionType not in VALID_ACTION_TYPES:
         raise HTTPException(
             status_code=400, 
             detail="actionType must be 'arguments' or 'outcome'"
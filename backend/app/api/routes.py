@@ -11,11 +11,15 @@ from app.api.models import (
     QueryBriefingRequest,
     QueryBriefingResponse,
 )
-from app.services.pdf_parser import extract_data_from_docs, generate_document_id
+from app.services.pdf_parser import generate_document_id
 from app.config import get_settings
+from app.utils.sse import sse_frame
 
 router = APIRouter()
 
+# SSE keepalive frame - constant, so it is serialized once rather than on every timeout
+SSE_KEEPALIVE_FRAME = sse_frame({"status": "keepalive"})
+
 # In-memory storage for demo (in production, use a database)
 documents_store: Dict[str, dict] = {}
 briefings_store: Dict[str, dict] = {}
@@ -68,12 +72,16 @@ async def upload_pdf(
             alternatives_path = save_file(alternatives, "alternatives")
 
         # Extract raw text from PDFs
-        from app.services.pdf_text_extractor import extract_text_from_pdfs
+        from app.services.pdf_text_extractor import extract_text_from_pdfs_concurrently
+
+        # Extract all documents in parallel; results keep input order, preserving document identity
+        pdf_paths = [supplier_offer_path, initial_request_path]
+        if alternatives_path:
+            pdf_paths.append(alternatives_path)
+        pdf_texts = await extract_text_from_pdfs_concurrently(pdf_paths)
 
-        # Extract texts separately to maintain document identity
-        supplier_offer_text = extract_text_from_pdfs([supplier_offer_path])[0]
-        initial_request_text = extract_text_from_pdfs([initial_request_path])[0]
-        alternatives_text = extract_text_from_pdfs([alternatives_path])[0] if alternatives_path else None
+        supplier_offer_text, initial_request_text = pdf_texts[0], pdf_texts[1]
+        alternatives_text = pdf_texts[2] if alternatives_path else None
 
         # Auto-extract form data from BOTH documents
         from app.services.form_extractor import extract_form_data_from_pdfs
@@ -128,6 +136,7 @@ async def generate_briefing(
 
     # Import here to avoid circular dependency
     from app.services.mas_pipeline import run_mas_pipeline
+    from app.utils.llm import close_llm_clients
     import uuid
     import asyncio
 
@@ -169,6 +178,7 @@ async def generate_briefing(
         except Exception as e:
             logger.error(f"[WRAPPER] Pipeline failed for job_id={job_id}: {str(e)}", exc_info=True)
         finally:
+            loop.run_until_complete(close_llm_clients())
             loop.close()
             logger.info(f"[WRAPPER] Event loop closed for job_id={job_id}")
 
@@ -190,7 +200,6 @@ async def stream_progress(job_id: str):
         SSE stream of progress events
     """
     from app.services.progress_tracker import progress_tracker
-    import json
     import asyncio
 
     async def event_generator():
@@ -201,7 +210,7 @@ async def stream_progress(job_id: str):
                 # Wait for event with timeout
                 try:
                     event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(event)}\n\n"
+                    yield sse_frame(event)
 
                     # Only close when the entire pipeline is complete (progress = 1.0)
                     # or when there's a fatal error
@@ -209,7 +218,7 @@ async def stream_progress(job_id: str):
                         break
                 except asyncio.TimeoutError:
                     # Send keepalive
-                    yield f"data: {json.dumps({'status': 'keepalive'})}\n\n"
+                    yield SSE_KEEPALIVE_FRAME
         finally:
             progress_tracker.unsubscribe(job_id, queue)
 
@@ -23,6 +23,13 @@ class Settings(BaseSettings):
     # App Config
     upload_dir: str = "./uploads"
     max_upload_size: int = 10485760  # 10MB
+    cache_dir: str = "./cache"  # Persistent caches (e.g. Perplexity research results)
+
+    # Reuse responses for identical LLM prompts across jobs and restarts
+    llm_cache_enabled: bool = True
+
+    # LLM request batching (for bulk runs with many concurrent jobs; disables token streaming)
+    llm_batching_enabled: bool = False
 
     class Config:
         env_file = ".env"
@@ -1,17 +1,27 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import logging
+import logging.handlers
+import queue
 from app.config import get_settings
+from app.utils.llm import configure_llm_cache, close_llm_clients
+from app.services.form_extractor import warm_up_form_extractor
+from app.utils.prompt_compress import warm_up_tokenizer
 
-# Configure logging
+# Configure logging - records are formatted by the caller but written to stderr by a
+# listener thread, so log output never blocks the event loop (or a pipeline job's loop)
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.StreamHandler()
+        logging.handlers.QueueHandler(log_queue)
     ]
 )
+log_listener.start()
 
 # Create FastAPI app
 app = FastAPI(
@@ -38,11 +48,31 @@ async def startup_event():
     # Create upload directory if not exists
     os.makedirs(settings.upload_dir, exist_ok=True)
 
+    # Serve repeated LLM prompts from the response cache
+    configure_llm_cache()
+
+    # Open the OpenAI connection before the first upload needs it
+    await warm_up_form_extractor()
+
+    # Load the tokenizer (may download its BPE file) off the event loop, before prompts need it
+    try:
+        await asyncio.to_thread(warm_up_tokenizer)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Tokenizer warm-up failed, first prompt will load it: {str(e)}")
+
     print("✅ Negotiation Briefing MAS API started")
     print(f"📁 Upload directory: {settings.upload_dir}")
+    print(f"💾 LLM response cache: {'enabled' if settings.llm_cache_enabled else 'disabled'}")
     print("⚠️  Vector database: disabled (awaiting new instructions)")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections on shutdown and flush pending log records."""
+    await close_llm_clients()
+    log_listener.stop()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
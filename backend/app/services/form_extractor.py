@@ -8,16 +8,28 @@ Document Types:
 - Initial Request: Contains what the company is looking for (product description, requirements)
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+import openai
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
-from app.utils.llm import get_llm
+from app.utils.llm import get_llm, get_structured_llm
+from app.utils.llm_batcher import LLMBatcher
+from app.utils.prompt_compress import normalize_head, truncate_at_boundary, content_chars
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Provider errors worth retrying; schema/validation failures are not retried
+TRANSIENT_LLM_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
 
 class ExtractedFormData(BaseModel):
     """Extracted form data from both documents."""
@@ -32,34 +44,23 @@ class ExtractedFormData(BaseModel):
     value_assessment: str = Field(description="Business value: urgent, high_impact, medium_impact, or low_impact")
 
 
-async def extract_form_data_from_pdfs(
-    supplier_offer_text: str,
-    initial_request_text: str
-) -> Dict[str, Any]:
-    """
-    Extract structured form data from both documents for form pre-filling.
-
-    Extraction logic:
-    - From Supplier Offer: supplier_name, supplier_contact, offer_price, pricing_model
-    - From Initial Request: product_description, product_type, requirements
-    - offer_price becomes max_price (the supplier's price is our ceiling)
-    - target_price is estimated as 10-20% below offer_price
-
-    Args:
-        supplier_offer_text: Raw text from supplier offer PDF
-        initial_request_text: Raw text from initial request PDF
-
-    Returns:
-        Dictionary matching FormDataInput schema for form pre-filling
-    """
-    logger.info("[FORM EXTRACTOR] Starting dual-document form data extraction")
+# Placeholder form data returned when extraction fails; validated against the schema at import
+FALLBACK_FORM_DATA: Dict[str, Any] = ExtractedFormData(
+    supplier_name="Unknown Supplier",
+    supplier_contact=None,
+    product_description="Product/service description not available",
+    product_type="service",
+    offer_price="0",
+    pricing_model="one-time",
+    max_price="0",
+    target_price="0",
+    value_assessment="medium_impact"
+).model_dump()
 
-    # Define parser
-    parser = PydanticOutputParser(pydantic_object=ExtractedFormData)
 
-    # Build prompt that uses BOTH documents
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an expert at extracting structured information from business documents.
+# Prompt uses BOTH documents
+FORM_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert at extracting structured information from business documents.
 
 You will receive TWO documents:
 1. **SUPPLIER OFFER**: The supplier's proposal/offer document containing pricing and supplier info
@@ -86,31 +87,125 @@ CALCULATED/ESTIMATED:
    - "medium_impact" if moderately important
    - "low_impact" if low priority
 
-{format_instructions}
-
 Important: The offer_price from the Supplier Offer should become the max_price - this is the ceiling we don't want to exceed."""),
-        ("user", """SUPPLIER OFFER DOCUMENT:
+    ("user", """SUPPLIER OFFER DOCUMENT:
 {supplier_offer_text}
 
 ---
 
 INITIAL REQUEST DOCUMENT:
 {initial_request_text}""")
-    ])
+])
+
+
+# Short document pairs (combined length after truncation) are extracted with the fast
+# model tier; longer, more complex offers use the accurate tier
+FAST_EXTRACTION_MAX_CHARS = 4000
+
+# Below this much combined text (e.g. scanned PDFs without a text layer) there is
+# nothing to extract - return the fallback without calling the LLM
+MIN_EXTRACTION_CHARS = 200
+
+
+def get_form_extraction_chain(tier: str = "accurate"):
+    """Build the extraction chain; the structured model is reused for the current event loop."""
+    # temperature=0 for deterministic extraction; function calling returns
+    # arguments that already match ExtractedFormData
+    chain = FORM_EXTRACTION_PROMPT | get_structured_llm(ExtractedFormData, temperature=0.0, tier=tier)
+
+    # Ride out rate limits and provider hiccups (exponential backoff with jitter)
+    # instead of falling back to placeholder form data on the first transient error
+    return chain.with_retry(
+        retry_if_exception_type=TRANSIENT_LLM_ERRORS,
+        wait_exponential_jitter=True,
+        stop_after_attempt=3,
+    )
+
+
+# Coalesce extraction calls across concurrent uploads when llm_batching_enabled is set
+form_extraction_batchers = {
+    tier: LLMBatcher(lambda tier=tier: get_form_extraction_chain(tier))
+    for tier in ("fast", "accurate")
+}
+
+
+async def warm_up_form_extractor(timeout: float = 5.0):
+    """
+    Open the OpenAI connection used by form extraction before the first upload.
+
+    Upload requests run on the server's event loop, so the client warmed here at
+    startup is the one get_llm hands to them. Best-effort: failures only log.
+
+    Args:
+        timeout: Maximum time to spend on the warm-up request in seconds
+    """
+    try:
+        llm = get_llm(temperature=0.0)
+        await asyncio.wait_for(llm.root_async_client.models.list(), timeout=timeout)
+        logger.info("[FORM EXTRACTOR] OpenAI connection warmed up")
+    except Exception as e:
+        logger.warning(f"[FORM EXTRACTOR] Warm-up failed, first extraction will connect lazily: {str(e)}")
+
+
+def build_extraction_inputs(supplier_offer_text: str, initial_request_text: str) -> Tuple[Dict[str, str], str]:
+    """
+    Normalize and truncate both documents for the prompt and pick the model tier for them.
+
+    Args:
+        supplier_offer_text: Raw text from supplier offer PDF
+        initial_request_text: Raw text from initial request PDF
+
+    Returns:
+        (prompt inputs, model tier)
+    """
+    extraction_inputs = {
+        "supplier_offer_text": truncate_at_boundary(normalize_head(supplier_offer_text, 5000), 5000),
+        "initial_request_text": truncate_at_boundary(normalize_head(initial_request_text, 5000), 5000)
+    }
+
+    input_chars = len(extraction_inputs["supplier_offer_text"]) + len(extraction_inputs["initial_request_text"])
+    tier = "fast" if input_chars < FAST_EXTRACTION_MAX_CHARS else "accurate"
+    logger.info(f"[FORM EXTRACTOR] Using {tier} model tier ({input_chars} chars)")
+    return extraction_inputs, tier
+
+
+async def extract_form_data_from_pdfs(
+    supplier_offer_text: str,
+    initial_request_text: str
+) -> Dict[str, Any]:
+    """
+    Extract structured form data from both documents for form pre-filling.
+
+    Extraction logic:
+    - From Supplier Offer: supplier_name, supplier_contact, offer_price, pricing_model
+    - From Initial Request: product_description, product_type, requirements
+    - offer_price becomes max_price (the supplier's price is our ceiling)
+    - target_price is estimated as 10-20% below offer_price
+
+    Args:
+        supplier_offer_text: Raw text from supplier offer PDF
+        initial_request_text: Raw text from initial request PDF
+
+    Returns:
+        Dictionary matching FormDataInput schema for form pre-filling
+    """
+    logger.info("[FORM EXTRACTOR] Starting dual-document form data extraction")
 
-    # Get LLM with temperature=0 for deterministic extraction
-    llm = get_llm(temperature=0.0)
+    if (content_chars(supplier_offer_text, MIN_EXTRACTION_CHARS)
+            + content_chars(initial_request_text, MIN_EXTRACTION_CHARS)) < MIN_EXTRACTION_CHARS:
+        logger.warning("[FORM EXTRACTOR] Documents contain almost no text (scanned PDFs?), skipping extraction")
+        return dict(FALLBACK_FORM_DATA)
 
-    # Build chain
-    chain = prompt | llm | parser
+    extraction_inputs, tier = build_extraction_inputs(supplier_offer_text, initial_request_text)
 
     # Execute
     try:
-        result: ExtractedFormData = await chain.ainvoke({
-            "supplier_offer_text": supplier_offer_text[:5000],
-            "initial_request_text": initial_request_text[:5000],
-            "format_instructions": parser.get_format_instructions()
-        })
+        if get_settings().llm_batching_enabled:
+            # Bulk runs: share a provider request window with other in-flight uploads
+            result: ExtractedFormData = await form_extraction_batchers[tier].submit(extraction_inputs)
+        else:
+            chain = get_form_extraction_chain(tier)
+            result: ExtractedFormData = await chain.ainvoke(extraction_inputs)
 
         logger.info(f"[FORM EXTRACTOR] Successfully extracted form data for supplier: {result.supplier_name}")
 
@@ -119,18 +214,8 @@ INITIAL REQUEST DOCUMENT:
     except Exception as e:
         logger.error(f"[FORM EXTRACTOR] Extraction failed: {str(e)}", exc_info=True)
 
-        # Return minimal fallback data
-        return {
-            "supplier_name": "Unknown Supplier",
-            "supplier_contact": None,
-            "product_description": "Product/service description not available",
-            "product_type": "service",
-            "offer_price": "0",
-            "pricing_model": "one-time",
-            "max_price": "0",
-            "target_price": "0",
-            "value_assessment": "medium_impact"
-        }
+        # Return minimal fallback data (a copy - callers may edit the form data)
+        return dict(FALLBACK_FORM_DATA)
 
 
 # Keep old function for backwards compatibility
@@ -4,10 +4,11 @@ MAS Pipeline - Orchestrates the negotiation briefing generation workflow.
 Parallel flow: parse → [5 parallel agents] → END
 """
 
-from app.agents.graph import negotiation_graph
+from app.agents.graph import get_negotiation_graph
 from app.agents.state import NegotiationState
 from app.api.routes import get_documents_store, get_briefings_store
 from app.services.progress_tracker import progress_tracker
+from app.services.vector_store import build_briefing_context
 
 
 async def run_mas_pipeline(
@@ -47,6 +48,8 @@ async def run_mas_pipeline(
             "alternatives_pdf": alternatives_pdf,
             "form_data": form_data,
             "parsed_input": None,
+            "research_context": {},
+            "research_results": None,
             "supplier_summary": None,
             "market_analysis": None,
             "offer_analysis": None,
@@ -64,7 +67,7 @@ async def run_mas_pipeline(
 
         # Publish start event
         logger.info(f"[PIPELINE] Publishing start event")
-        await progress_tracker.publish(job_id, {
+        progress_tracker.publish_background(job_id, {
             "agent": "system",
             "status": "running",
             "message": "Starting negotiation briefing generation...",
@@ -73,11 +76,11 @@ async def run_mas_pipeline(
 
         # Run the graph
         logger.info(f"[PIPELINE] Invoking negotiation graph...")
-        final_state = await negotiation_graph.ainvoke(initial_state)
+        final_state = await get_negotiation_graph().ainvoke(initial_state)
         logger.info(f"[PIPELINE] Graph execution completed. Errors: {len(final_state.get('errors', []))}")
 
         # Check for errors
-        if final_state.get("errors") and len(final_state["errors"]) > 0:
+        if final_state.get("errors"):
             logger.error(f"[PIPELINE] Pipeline failed with errors: {final_state['errors']}")
             briefings_store[job_id] = {
                 "status": "error",
@@ -102,15 +105,19 @@ async def run_mas_pipeline(
         action_items_data = final_state.get("action_items")
         action_items_array = action_items_data.get("items") if action_items_data else []
 
+        briefing = {
+            "supplier_summary": final_state.get("supplier_summary"),
+            "market_analysis": final_state.get("market_analysis"),
+            "offer_analysis": final_state.get("offer_analysis"),
+            "outcome_assessment": final_state.get("outcome_assessment"),
+            "action_items": action_items_array,  # Extract items array for frontend
+        }
+
         briefings_store[job_id] = {
             "status": "completed",
-            "briefing": {
-                "supplier_summary": final_state.get("supplier_summary"),
-                "market_analysis": final_state.get("market_analysis"),
-                "offer_analysis": final_state.get("offer_analysis"),
-                "outcome_assessment": final_state.get("outcome_assessment"),
-                "action_items": action_items_array,  # Extract items array for frontend
-            },
+            "briefing": briefing,
+            # Pre-built LLM context for the live-call insight endpoints
+            "briefing_context": build_briefing_context(briefing),
             "parsed_input": final_state.get("parsed_input"),
             "vector_db_id": None,  # Will be set when stored to Pinecone
             "stored_to_pinecone": False  # Track if already stored
@@ -2,22 +2,28 @@
 PDF Text Extractor - Simple text extraction from PDFs without structured parsing.
 """
 
+import asyncio
 import pdfplumber
 from typing import List
 import logging
 
+from app.utils.prompt_compress import PAGE_BREAK
+
 logger = logging.getLogger(__name__)
 
 
 def extract_text_from_pdf(file_path: str) -> str:
     """
-    Extract raw text from a single PDF file.
+    Extract text from a single PDF file.
+
+    The raw text is returned and stored as-is; prompt builders apply
+    prompt_compress.normalize_head to the part they send to the LLM.
 
     Args:
         file_path: Path to PDF file
 
     Returns:
-        Raw text content
+        Raw text content, pages separated by PAGE_BREAK
     """
     try:
         text_parts = []
@@ -27,7 +33,8 @@ def extract_text_from_pdf(file_path: str) -> str:
                 if text:
                     text_parts.append(text)
 
-        return "\n\n".join(text_parts)
+        # Page breaks let normalize_text tell running headers/footers from body lines
+        return PAGE_BREAK.join(text_parts)
 
     except Exception as e:
         logger.error(f"Error extracting text from {file_path}: {e}")
@@ -50,3 +57,23 @@ def extract_text_from_pdfs(file_paths: List[str]) -> List[str]:
         texts.append(text)
 
     return texts
+
+
+async def extract_text_from_pdfs_concurrently(file_paths: List[str]) -> List[str]:
+    """
+    Extract raw text from multiple PDF files in parallel worker threads.
+
+    pdfplumber parsing is blocking, so each file is handed to the default
+    executor; the event loop stays free and the files are parsed side by side.
+
+    Args:
+        file_paths: List of PDF file paths
+
+    Returns:
+        List of text contents (one per PDF, in input order)
+    """
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(*[
+        loop.run_in_executor(None, extract_text_from_pdf, path)
+        for path in file_paths
+    ]))
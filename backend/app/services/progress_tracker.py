@@ -1,7 +1,11 @@
 import asyncio
-from typing import Dict, List
+import logging
+import time
+from typing import Dict, List, Tuple
 from collections import defaultdict
 
+logger = logging.getLogger(__name__)
+
 
 class ProgressTracker:
     """
@@ -13,6 +17,10 @@ class ProgressTracker:
     def __init__(self):
         # {job_id: [queue1, queue2, ...]}
         self.subscribers: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+        # Throttling state for publish_throttled, per (job_id, agent)
+        self._last_published: Dict[Tuple[str, str], float] = {}
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        self._pending_timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
 
     async def publish(self, job_id: str, event: dict):
         """
@@ -22,13 +30,103 @@ class ProgressTracker:
             job_id: The job ID
             event: Event data (dict with agent, status, message, progress)
         """
+        # An explicit publish supersedes any throttled update still waiting
+        self._reset_throttle((job_id, event.get("agent")))
+
         if job_id in self.subscribers:
             # Send to all queues for this job
             for queue in self.subscribers[job_id]:
                 try:
                     await queue.put(event)
                 except Exception as e:
-                    print(f"Error publishing to queue: {e}")
+                    logger.error(f"[PROGRESS] Error publishing to queue for job_id={job_id}: {e}")
+
+    def publish_background(self, job_id: str, event: dict):
+        """
+        Publish a progress event without awaiting.
+
+        For intermediate progress updates, so the caller moves straight on to its
+        next external call. Subscriber queues are unbounded, so the event is
+        enqueued immediately - it can never be overtaken by a later awaited
+        publish(). Delivery failures are logged rather than raised.
+
+        Args:
+            job_id: The job ID
+            event: Event data (dict with agent, status, message, progress)
+        """
+        for queue in self.subscribers.get(job_id, []):
+            try:
+                queue.put_nowait(event)
+            except Exception as e:
+                logger.error(f"[PROGRESS] Error publishing to queue for job_id={job_id}: {e}")
+
+    def publish_throttled(self, job_id: str, event: dict, min_interval_ms: int = 50):
+        """
+        Publish a progress event, coalescing bursts from the same agent.
+
+        For high-frequency updates (e.g. per streamed field). Within
+        min_interval_ms of the agent's previous event, the event replaces any
+        update already waiting and is sent once the interval has passed, so only
+        the most recent payload reaches the client. Completed and error events
+        are always sent immediately and discard the waiting update.
+
+        Args:
+            job_id: The job ID
+            event: Event data (dict with agent, status, message, progress)
+            min_interval_ms: Minimum time between events for the same agent
+        """
+        key = (job_id, event.get("agent"))
+
+        if event.get("status") in ("completed", "error"):
+            self._reset_throttle(key)
+            self.publish_background(job_id, event)
+            return
+
+        remaining = self._last_published.get(key, 0.0) + min_interval_ms / 1000 - time.monotonic()
+        if remaining <= 0 and key not in self._pending:
+            self._send_throttled(key, event)
+            return
+
+        # Coalesce: keep only the latest payload and send it when the interval ends
+        self._pending[key] = event
+        if key not in self._pending_timers:
+            self._pending_timers[key] = asyncio.get_running_loop().call_later(
+                max(remaining, 0.0), self._flush_pending, key
+            )
+
+    def _send_throttled(self, key: Tuple[str, str], event: dict):
+        self._last_published[key] = time.monotonic()
+        self.publish_background(key[0], event)
+
+    def _flush_pending(self, key: Tuple[str, str]):
+        self._pending_timers.pop(key, None)
+        event = self._pending.pop(key, None)
+        if event is not None:
+            self._send_throttled(key, event)
+
+    def _reset_throttle(self, key: Tuple[str, str]):
+        timer = self._pending_timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        self._pending.pop(key, None)
+        self._last_published.pop(key, None)
+
+    async def flush(self, job_id: str, timeout: float = 0.1):
+        """
+        Wait until all subscribers for this job have consumed their queued events.
+
+        Returns immediately when nobody is subscribed or the queues are already
+        drained, so callers only wait as long as the SSE stream actually needs.
+
+        Args:
+            job_id: The job ID
+            timeout: Maximum time to wait in seconds
+        """
+        deadline = time.monotonic() + timeout
+        while any(not queue.empty() for queue in self.subscribers.get(job_id, [])):
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.005)
 
     def subscribe(self, job_id: str) -> asyncio.Queue:
         """
@@ -3,6 +3,7 @@ Vector store service - Uses in-memory briefing context for action insights.
 """
 import json
 import logging
+import re
 from typing import Dict, Any
 from app.config import get_settings
 from app.utils.llm import get_llm
@@ -31,16 +32,19 @@ def get_briefing_data(vector_db_id: str) -> dict | None:
     
     briefings_store = get_briefings_store()
     
-    logger.info(f"[BRIEFING DEBUG] Looking for vector_db_id={vector_db_id}")
-    logger.info(f"[BRIEFING DEBUG] Available keys in store: {list(briefings_store.keys())}")
+    # Runs on every live-call request - only build the diagnostics when DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[BRIEFING DEBUG] Looking for vector_db_id=%s", vector_db_id)
+        logger.debug("[BRIEFING DEBUG] Available keys in store: %s", list(briefings_store.keys()))
     
     if vector_db_id not in briefings_store:
-        logger.warning(f"[BRIEFING DEBUG] Briefing NOT FOUND for vector_db_id={vector_db_id}")
+        logger.warning("[BRIEFING DEBUG] Briefing NOT FOUND for vector_db_id=%s", vector_db_id)
         return None
     
     briefing_data = briefings_store[vector_db_id]
     briefing = briefing_data.get("briefing", {})
-    logger.info(f"[BRIEFING DEBUG] Found briefing with keys: {list(briefing.keys()) if briefing else 'EMPTY'}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[BRIEFING DEBUG] Found briefing with keys: %s", list(briefing.keys()) if briefing else "EMPTY")
     return briefing
 
 
@@ -183,22 +187,16 @@ def get_metrics_context(briefing: dict) -> str:
     return "\n\n".join(context_parts) if context_parts else "No briefing context available."
 
 
-def get_briefing_context(vector_db_id: str, action_type: str = None) -> str:
+def build_briefing_context(briefing: dict) -> str:
     """
-    Get briefing context from in-memory store.
-    
-    Returns the full briefing context for all action types.
+    Format all briefing sections into a single LLM context string.
 
     Args:
-        vector_db_id: The job_id used to look up the briefing
-        action_type: Optional - ignored, always returns full context
+        briefing: Briefing dictionary (supplier_summary, market_analysis, ...)
 
     Returns:
         Formatted context string with all briefing sections
     """
-    # Get briefing data from in-memory store
-    briefing = get_briefing_data(vector_db_id)
-    
     if not briefing:
         return "No briefing context available."
     
@@ -212,6 +210,45 @@ def get_briefing_context(vector_db_id: str, action_type: str = None) -> str:
     return "\n".join(context_parts)
 
 
+def get_briefing_context(vector_db_id: str, action_type: str = None) -> str:
+    """
+    Get briefing context from in-memory store.
+    
+    Returns the full briefing context for all action types. The context is
+    built once when the pipeline stores the briefing; live-call endpoints
+    request it repeatedly, so it is not re-formatted per request.
+
+    Args:
+        vector_db_id: The job_id used to look up the briefing
+        action_type: Optional - ignored, always returns full context
+
+    Returns:
+        Formatted context string with all briefing sections
+    """
+    from app.api.routes import get_briefings_store
+
+    briefing_context = (get_briefings_store().get(vector_db_id) or {}).get("briefing_context")
+    if briefing_context:
+        return briefing_context
+
+    # Briefings stored without a pre-built context
+    return build_briefing_context(get_briefing_data(vector_db_id))
+
+
+# Briefing Q&A prompt (compiled once at import)
+RAG_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are a helpful assistant answering questions about a negotiation briefing.
+Use the provided context to answer the question accurately and concisely.
+If the context doesn't contain enough information, say so."""),
+    ("user", """Briefing Context:
+{context}
+
+Question: {question}
+
+Answer:""")
+])
+
+
 async def query_briefing_rag(vector_db_id: str, query: str) -> Dict[str, Any]:
     """
     Query the briefing using the in-memory context.
@@ -227,20 +264,7 @@ async def query_briefing_rag(vector_db_id: str, query: str) -> Dict[str, Any]:
         }
 
     llm = get_llm(temperature=0.3)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a helpful assistant answering questions about a negotiation briefing.
-Use the provided context to answer the question accurately and concisely.
-If the context doesn't contain enough information, say so."""),
-        ("user", """Briefing Context:
-{context}
-
-Question: {question}
-
-Answer:""")
-    ])
-
-    chain = prompt | llm
+    chain = RAG_PROMPT | llm
 
     try:
         response = await chain.ainvoke({
@@ -290,6 +314,23 @@ Example format:
 • Opportunity: they mentioned budget flexibility"""
 }
 
+# Chat prompt per action type (compiled once at import; shared by the sync and streaming paths)
+ACTION_INSIGHT_PROMPTS = {
+    action_type: ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("user", """Briefing Context:
+{briefing_context}
+
+{goals_section}
+
+Current Conversation:
+{conversation}
+
+Provide your insights:""")
+    ])
+    for action_type, system_prompt in ACTION_PROMPTS.items()
+}
+
 
 async def query_for_action_insights(
     vector_db_id: str,
@@ -320,25 +361,12 @@ async def query_for_action_insights(
         for msg in conversation_messages[-10:]
     ]) if conversation_messages else "No conversation yet."
     
-    # Get system prompt
-    system_prompt = ACTION_PROMPTS.get(action_type, ACTION_PROMPTS["arguments"])
+    # Get the compiled prompt for this action type
+    prompt = ACTION_INSIGHT_PROMPTS.get(action_type, ACTION_INSIGHT_PROMPTS["arguments"])
     goals_section = f"User's Goals:\n{goals}" if goals else ""
     
     llm = get_llm(temperature=0.4)
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", """Briefing Context:
-{briefing_context}
-
-{goals_section}
-
-Current Conversation:
-{conversation}
-
-Provide your insights:""")
-    ])
-    
     chain = prompt | llm
     
     try:
@@ -381,8 +409,8 @@ async def stream_action_insights(
         for msg in conversation_messages[-10:]
     ]) if conversation_messages else "No conversation yet."
     
-    # Get system prompt
-    system_prompt = ACTION_PROMPTS.get(action_type, ACTION_PROMPTS["arguments"])
+    # Get the compiled prompt for this action type
+    prompt = ACTION_INSIGHT_PROMPTS.get(action_type, ACTION_INSIGHT_PROMPTS["arguments"])
     goals_section = f"User's Goals:\n{goals}" if goals else ""
     
     # Use streaming LLM
@@ -395,19 +423,6 @@ async def stream_action_insights(
         streaming=True
     )
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", """Briefing Context:
-{briefing_context}
-
-{goals_section}
-
-Current Conversation:
-{conversation}
-
-Provide your insights:""")
-    ])
-    
     chain = prompt | streaming_llm
     
     try:
@@ -440,6 +455,19 @@ Consider from the briefing:
 Respond with ONLY valid JSON, no other text:
 {{"value": <number>, "risk": <number>, "outcome": <number>}}"""
 
+METRICS_CHAT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", METRICS_PROMPT),
+    ("user", """Briefing Context:
+{briefing_context}
+
+{goals_section}
+
+Current Conversation:
+{conversation}
+
+Analyze and return metrics JSON:""")
+])
+
 
 async def analyze_conversation_metrics(
     vector_db_id: str,
@@ -457,14 +485,19 @@ async def analyze_conversation_metrics(
     Returns:
         Dictionary with value, risk, outcome (0-100 each)
     """
-    logger.info(f"[METRICS DEBUG] Called with vector_db_id={vector_db_id}")
-    logger.info(f"[METRICS DEBUG] conversation_messages count: {len(conversation_messages) if conversation_messages else 0}")
-    logger.info(f"[METRICS DEBUG] goals: {goals[:100] if goals else 'None'}...")
+    # Called every few seconds during a live call - keep the diagnostics off the
+    # hot path unless DEBUG logging is on
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    if debug_enabled:
+        logger.debug("[METRICS DEBUG] Called with vector_db_id=%s", vector_db_id)
+        logger.debug("[METRICS DEBUG] conversation_messages count: %d", len(conversation_messages) if conversation_messages else 0)
+        logger.debug("[METRICS DEBUG] goals: %s...", goals[:100] if goals else "None")
     
     # Get metrics-specific briefing context
     briefing_context = get_briefing_context(vector_db_id, action_type="metrics")
-    logger.info(f"[METRICS DEBUG] briefing_context length: {len(briefing_context)}")
-    logger.info(f"[METRICS DEBUG] briefing_context preview: {briefing_context[:200]}...")
+    if debug_enabled:
+        logger.debug("[METRICS DEBUG] briefing_context length: %d", len(briefing_context))
+        logger.debug("[METRICS DEBUG] briefing_context preview: %s...", briefing_context[:200])
     
     # Build conversation context
     conversation_text = "\n".join([
@@ -472,35 +505,22 @@ async def analyze_conversation_metrics(
         for msg in conversation_messages[-15:]
     ]) if conversation_messages else ""
     
-    logger.info(f"[METRICS DEBUG] conversation_text length: {len(conversation_text)}")
-    logger.info(f"[METRICS DEBUG] conversation_text: {conversation_text[:300]}...")
+    if debug_enabled:
+        logger.debug("[METRICS DEBUG] conversation_text length: %d", len(conversation_text))
+        logger.debug("[METRICS DEBUG] conversation_text: %s...", conversation_text[:300])
     
     # If no conversation, return neutral metrics
     if not conversation_text.strip():
-        logger.info("[METRICS DEBUG] No conversation text - returning neutral 50s")
+        logger.debug("[METRICS DEBUG] No conversation text - returning neutral 50s")
         return {"value": 50, "risk": 50, "outcome": 50}
     
     goals_section = f"User's Goals:\n{goals}" if goals else ""
     
     llm = get_llm(temperature=0.2)
-    
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", METRICS_PROMPT),
-        ("user", """Briefing Context:
-{briefing_context}
-
-{goals_section}
-
-Current Conversation:
-{conversation}
-
-Analyze and return metrics JSON:""")
-    ])
-    
-    chain = prompt | llm
+    chain = METRICS_CHAT_PROMPT | llm
     
     try:
-        logger.info("[METRICS DEBUG] Calling LLM...")
+        logger.debug("[METRICS DEBUG] Calling LLM...")
         response = await chain.ainvoke({
             "briefing_context": briefing_context,
             "goals_section": goals_section,
@@ -508,15 +528,14 @@ Analyze and return metrics JSON:""")
         })
         
         # Parse JSON response
-        import re
         content = response.content.strip()
-        logger.info(f"[METRICS DEBUG] LLM response: {content}")
+        logger.debug("[METRICS DEBUG] LLM response: %s", content)
         
         # Try to extract JSON from response
         json_match = re.search(r'\{[^}]+\}', content)
         if json_match:
             metrics = json.loads(json_match.group())
-            logger.info(f"[METRICS DEBUG] Parsed metrics: {metrics}")
+            logger.debug("[METRICS DEBUG] Parsed metrics: %s", metrics)
             
             # Validate and clamp values
             result = {
@@ -524,10 +543,10 @@ Analyze and return metrics JSON:""")
                 "risk": max(0, min(100, int(metrics.get("risk", 50)))),
                 "outcome": max(0, min(100, int(metrics.get("outcome", 50))))
             }
-            logger.info(f"[METRICS DEBUG] Final result: {result}")
+            logger.debug("[METRICS DEBUG] Final result: %s", result)
             return result
         else:
-            logger.warning(f"[METRICS DEBUG] Could not parse metrics JSON: {content}")
+            logger.warning("[METRICS DEBUG] Could not parse metrics JSON: %s", content)
             return {"value": 50, "risk": 50, "outcome": 50}
             
     except Exception as e:
@@ -551,6 +570,14 @@ Rules:
 Return ONLY a JSON array of the IDs of completed items, like: [1, 3, 5]
 If no items are completed, return: []"""
 
+ACTION_ITEMS_CHAT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", ACTION_ITEMS_PROMPT),
+    ("user", """Conversation:
+{conversation}
+
+Which action items (by ID) have been completed? Return ONLY a JSON array:""")
+])
+
 
 async def analyze_action_items_completion(
     vector_db_id: str,
@@ -591,16 +618,7 @@ async def analyze_action_items_completion(
     ])
     
     llm = get_llm(temperature=0.1)  # Low temperature for consistent results
-    
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", ACTION_ITEMS_PROMPT),
-        ("user", """Conversation:
-{conversation}
-
-Which action items (by ID) have been completed? Return ONLY a JSON array:""")
-    ])
-    
-    chain = prompt | llm
+    chain = ACTION_ITEMS_CHAT_PROMPT | llm
     
     try:
         response = await chain.ainvoke({
@@ -612,7 +630,6 @@ Which action items (by ID) have been completed? Return ONLY a JSON array:""")
         logger.info(f"[ACTION ITEMS] LLM response: {content}")
         
         # Parse JSON array from response
-        import re
         json_match = re.search(r'\[[\d,\s]*\]', content)
         if json_match:
             ai_completed_ids = json.loads(json_match.group())
@@ -672,6 +689,8 @@ Respond in the following JSON format ONLY:
   "nextActionItems": ["Action 1", "Action 2", "Action 3"]
 }}"""
 
+SUMMARY_TEMPLATE = ChatPromptTemplate.from_template(SUMMARY_PROMPT)
+
 
 async def generate_call_summary_and_next_actions(
     vector_db_id: str,
@@ -708,9 +727,7 @@ async def generate_call_summary_and_next_actions(
         # Goals
         goals_text = goals or "No specific goals defined."
         
-        # Create prompt
-        prompt = ChatPromptTemplate.from_template(SUMMARY_PROMPT)
-        chain = prompt | get_llm()
+        chain = SUMMARY_TEMPLATE | get_llm()
         
         response = await chain.ainvoke({
             "briefing_context": briefing_context,
@@ -724,7 +741,6 @@ async def generate_call_summary_and_next_actions(
         logger.info(f"[SUMMARY] LLM response: {content[:500]}...")
         
         # Parse JSON response
-        import re
         json_match = re.search(r'\{[\s\S]*\}', content)
         if json_match:
             result = json.loads(json_match.group())
@@ -787,6 +803,8 @@ Key agreements were reached on payments. The supplier showed flexibility on time
 - Schedule follow-up call
 - Review contract terms"""
 
+STREAMING_SUMMARY_TEMPLATE = ChatPromptTemplate.from_template(STREAMING_SUMMARY_PROMPT)
+
 
 async def stream_call_summary_and_next_actions(
     vector_db_id: str,
@@ -843,8 +861,7 @@ async def stream_call_summary_and_next_actions(
             streaming=True
         )
         
-        prompt = ChatPromptTemplate.from_template(STREAMING_SUMMARY_PROMPT)
-        chain = prompt | streaming_llm
+        chain = STREAMING_SUMMARY_TEMPLATE | streaming_llm
         
         logger.info(f"[STREAM SUMMARY] Starting LLM stream...")
         
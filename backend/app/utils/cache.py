@@ -0,0 +1,207 @@
+"""Response caches for agent outputs and external research calls."""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+
+def make_cache_key(namespace: str, payload: Dict[str, Any]) -> str:
+    """
+    Build a deterministic cache key from a JSON-serializable payload.
+
+    Args:
+        namespace: Prefix identifying the cache user (e.g. "action_items")
+        payload: Inputs that fully determine the cached value
+
+    Returns:
+        Namespaced blake2b hex digest of the sorted JSON payload
+    """
+    # orjson serializes straight to UTF-8 bytes, several times faster than json.dumps
+    serialized = orjson.dumps(payload, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    digest = hashlib.blake2b(serialized, digest_size=16).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class TTLCache:
+    """
+    Bounded exact-match cache with per-entry expiry.
+
+    Entries are evicted when they expire or, once max_entries is reached,
+    in least-recently-used order. Pipeline jobs run on their own threads,
+    so all access is guarded by a lock.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # {key: (expires_at, value)}
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing or expired.
+
+        Args:
+            key: Cache key (see make_cache_key)
+
+        Returns:
+            Cached value or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value under key, evicting the oldest entry if the cache is full.
+
+        Args:
+            key: Cache key (see make_cache_key)
+            value: Value to cache (callers should store plain dicts, not models)
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over normalized embedding vectors.
+
+    A lookup returns the stored value whose embedding has the highest cosine
+    similarity with the query, provided it clears the configured threshold.
+    The cache is small and bounded, so a linear scan is sufficient.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int = 256):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # [(expires_at, vector, value), ...] oldest first
+        self._entries: list = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> List[float]:
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else list(vector)
+
+    def get(self, vector: List[float]) -> Optional[Any]:
+        """
+        Return the most similar cached value, or None if nothing is close enough.
+
+        Args:
+            vector: Query embedding (need not be normalized)
+
+        Returns:
+            Cached value or None
+        """
+        query = self._normalize(vector)
+        now = time.monotonic()
+        best_score, best_value = -1.0, None
+
+        with self._lock:
+            self._entries = [entry for entry in self._entries if entry[0] >= now]
+            for _, cached_vector, value in self._entries:
+                score = sum(a * b for a, b in zip(query, cached_vector))
+                if score > best_score:
+                    best_score, best_value = score, value
+
+        return best_value if best_score >= self.threshold else None
+
+    def add(self, vector: List[float], value: Any):
+        """
+        Store a value under its embedding, evicting the oldest entry if full.
+
+        Args:
+            vector: Embedding of the inputs that produced value
+            value: Value to cache (callers should store plain dicts, not models)
+        """
+        entry = (time.monotonic() + self.ttl_seconds, self._normalize(vector), value)
+        with self._lock:
+            self._entries.append(entry)
+            if len(self._entries) > self.max_entries:
+                del self._entries[: len(self._entries) - self.max_entries]
+
+
+class DiskCache:
+    """
+    Persistent JSON cache with per-entry expiry, one file per key.
+
+    Survives restarts and is shared by every worker on the host, which suits
+    slow-changing external results (e.g. research queries). Writes go through
+    a temp file and os.replace, so concurrent readers never see partial entries.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key.replace(":", "_") + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing, expired or unreadable.
+
+        Args:
+            key: Cache key (see make_cache_key)
+
+        Returns:
+            Cached value or None
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("expires_at", 0) < time.time():
+            # Drop the stale file so the cache directory doesn't grow without bound
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any):
+        """
+        Store a JSON-serializable value under key.
+
+        Args:
+            key: Cache key (see make_cache_key)
+            value: JSON-serializable value to cache
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {"expires_at": time.time() + self.ttl_seconds, "value": value}
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
@@ -1,12 +1,201 @@
-from langchain_openai import ChatOpenAI
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from app.config import get_settings
 
+# Model per quality tier: "fast" for simple structured generation, "accurate" for synthesis
+LLM_TIERS = {
+    "fast": "gpt-4o-mini",
+    "accurate": "gpt-4o",
+}
 
-def get_llm(temperature: float = 0.7, model: str = "gpt-4o"):
-    """Get configured LLM instance."""
+# Clients are reused per event loop: each pipeline job runs on its own loop, and the
+# async OpenAI client's connection pool must not be shared across loops. Keyed by
+# (model, temperature), (model, temperature, schema) for structured-output runnables,
+# or ("embeddings", model, dimensions)
+_llm_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+# One pooled HTTP/2 connection per loop, shared by every chat model on that loop
+# (and by other HTTP callers through get_http_client)
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_llm_clients_lock = threading.Lock()
+
+
+def configure_llm_cache():
+    """
+    Enable LangChain's process-wide LLM response cache (SQLite under cache_dir).
+
+    Identical prompts with identical model parameters return the stored response
+    instead of calling OpenAI. Streaming calls are not cached.
+    """
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return
+
+    os.makedirs(settings.cache_dir, exist_ok=True)
+    set_llm_cache(SQLiteCache(database_path=os.path.join(settings.cache_dir, "llm_cache.db")))
+
+
+def _create_llm(model: str, temperature: float, http_async_client: Optional[httpx.AsyncClient] = None) -> ChatOpenAI:
     settings = get_settings()
     return ChatOpenAI(
         model=model,
         temperature=temperature,
         api_key=settings.openai_api_key,
+        http_async_client=http_async_client,
     )
+
+
+def _get_http_client(loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+    """Pooled HTTP/2 client for the given loop; caller must hold _llm_clients_lock."""
+    http_client = _http_clients.get(loop)
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100, keepalive_expiry=60.0),
+            timeout=60.0,
+        )
+        _http_clients[loop] = http_client
+    return http_client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the running loop's pooled HTTP/2 client.
+
+    The same pool serves the OpenAI clients from this module, so other async
+    HTTP callers (e.g. Perplexity) reuse its connections, DNS and TLS sessions
+    instead of opening their own. Closed by close_llm_clients().
+
+    Returns:
+        Shared httpx.AsyncClient for the current event loop
+    """
+    loop = asyncio.get_running_loop()
+    with _llm_clients_lock:
+        return _get_http_client(loop)
+
+
+def get_llm(temperature: float = 0.7, model: str = "gpt-4o", tier: Optional[str] = None):
+    """
+    Get configured LLM instance. If tier is given it selects the model from LLM_TIERS.
+
+    Inside a running event loop the client is cached per (model, temperature) for
+    that loop and all of them share one HTTP/2 connection pool; outside one a
+    fresh client is returned.
+    """
+    model = LLM_TIERS[tier] if tier else model
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _create_llm(model, temperature)
+
+    with _llm_clients_lock:
+        clients = _llm_clients.setdefault(loop, {})
+        key = (model, temperature)
+        if key not in clients:
+            clients[key] = _create_llm(model, temperature, _get_http_client(loop))
+        return clients[key]
+
+
+def get_structured_llm(schema: type, temperature: float = 0.0, model: str = "gpt-4o", tier: Optional[str] = None):
+    """
+    Get get_llm(...).with_structured_output(schema), cached alongside the client.
+
+    Binding a schema converts the pydantic model into an OpenAI function
+    definition; caching the bound runnable per event loop keeps that work off
+    the per-call path.
+    """
+    llm = get_llm(temperature=temperature, model=model, tier=tier)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return llm.with_structured_output(schema)
+
+    with _llm_clients_lock:
+        clients = _llm_clients.setdefault(loop, {})
+        key = (llm.model_name, temperature, schema)
+        if key not in clients:
+            clients[key] = llm.with_structured_output(schema)
+        return clients[key]
+
+
+def _get_cached_chain(prompt, llm):
+    """prompt | llm, cached per event loop; llm must come from this module's caches."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return prompt | llm
+
+    with _llm_clients_lock:
+        clients = _llm_clients.setdefault(loop, {})
+        # Prompts are module-level constants and llm is cached on this loop,
+        # so both identities are stable keys
+        key = ("chain", id(prompt), id(llm))
+        if key not in clients:
+            clients[key] = prompt | llm
+        return clients[key]
+
+
+def get_chain(prompt, temperature: float = 0.7, model: str = "gpt-4o", tier: Optional[str] = None):
+    """
+    Get prompt | get_llm(...), cached alongside the client.
+
+    For module-level prompts reused by every job: the composed chain is built
+    once per event loop instead of on every call.
+    """
+    return _get_cached_chain(prompt, get_llm(temperature=temperature, model=model, tier=tier))
+
+
+def get_structured_chain(prompt, schema: type, temperature: float = 0.0, model: str = "gpt-4o", tier: Optional[str] = None):
+    """
+    Get prompt | get_structured_llm(schema, ...), cached alongside the client.
+
+    For module-level prompts reused by every job: the composed chain is built
+    once per event loop instead of on every call, and runs on the loop's
+    pooled connection like every other client from this module.
+    """
+    return _get_cached_chain(prompt, get_structured_llm(schema, temperature=temperature, model=model, tier=tier))
+
+
+async def close_llm_clients():
+    """Close the pooled HTTP client of the running event loop; call before the loop shuts down."""
+    loop = asyncio.get_running_loop()
+    with _llm_clients_lock:
+        _llm_clients.pop(loop, None)
+        http_client = _http_clients.pop(loop, None)
+
+    if http_client is not None:
+        await http_client.aclose()
+
+
+def get_embeddings(model: str = "text-embedding-3-small", dimensions: int = 256):
+    """
+    Get configured embeddings instance (reduced dimensions keep similarity lookups cheap).
+
+    Like get_llm, inside a running event loop the instance is cached for that
+    loop and shares its pooled HTTP connection with the chat models.
+    """
+    settings = get_settings()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return OpenAIEmbeddings(model=model, dimensions=dimensions, api_key=settings.openai_api_key)
+
+    with _llm_clients_lock:
+        clients = _llm_clients.setdefault(loop, {})
+        key = ("embeddings", model, dimensions)
+        if key not in clients:
+            clients[key] = OpenAIEmbeddings(
+                model=model,
+                dimensions=dimensions,
+                api_key=settings.openai_api_key,
+                http_async_client=_get_http_client(loop),
+            )
+        return clients[key]
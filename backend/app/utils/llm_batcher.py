@@ -0,0 +1,97 @@
+"""Coalesce LLM calls from concurrent jobs into batched provider requests."""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBatcher:
+    """
+    Micro-batcher for chat model (or prompt | model chain) calls.
+
+    Requests arriving within window_ms of each other (up to max_batch_size) are
+    dispatched together with Runnable.abatch. Every pipeline job runs on its own
+    thread and event loop, so the batcher owns a dedicated background loop:
+    callers submit from any loop and await the result through a thread-safe future.
+    """
+
+    def __init__(
+        self,
+        llm_factory: Callable[[], Any],
+        window_ms: int = 50,
+        max_batch_size: int = 8,
+    ):
+        """
+        Args:
+            llm_factory: Returns the Runnable to batch against (created on the batcher loop)
+            window_ms: How long to wait for more requests after the first one arrives
+            max_batch_size: Dispatch immediately once this many requests are pending
+        """
+        self._llm_factory = llm_factory
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+
+        self._llm = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+        # Only touched from the batcher loop
+        self._pending: List[Tuple[Any, concurrent.futures.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-batcher", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def submit(self, messages: Any) -> Any:
+        """
+        Queue a call and wait for its result.
+
+        Args:
+            messages: Runnable input (role/content messages, or prompt variables for a chain)
+
+        Returns:
+            The Runnable's output for this input
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._ensure_loop().call_soon_threadsafe(self._enqueue, messages, future)
+        return await asyncio.wrap_future(future)
+
+    def _enqueue(self, messages: Any, future: concurrent.futures.Future):
+        self._pending.append((messages, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.window_ms / 1000, self._dispatch)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self._loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[Any, concurrent.futures.Future]]):
+        if self._llm is None:
+            self._llm = self._llm_factory()
+
+        logger.info(f"[LLM_BATCHER] Dispatching batch of {len(batch)} request(s)")
+        try:
+            results = await self._llm.abatch([messages for messages, _ in batch], return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
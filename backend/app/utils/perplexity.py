@@ -1,13 +1,139 @@
 """Perplexity API client utility for research queries."""
 
 import asyncio
+import concurrent.futures
 import json
 import logging
+import os
+import re
+import string
+import threading
 from typing import Dict, List, Optional
-import requests
+import httpx
+
+from app.config import get_settings
+from app.utils.cache import DiskCache, SemanticCache, make_cache_key
+from app.utils.llm import get_embeddings, get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Reasoning traces emitted by sonar-reasoning models
+_THINK_RE = re.compile(r'<think>.*?</think>', flags=re.DOTALL)
+
+# Research results change slowly, so successful responses are reused for a week
+PERPLEXITY_CACHE_TTL_SECONDS = 7 * 86400
+_perplexity_cache: Optional[DiskCache] = None
+
+# Paraphrased queries from the same product-only template (e.g. "CRM software" vs
+# "CRM Software") reuse a stored answer
+PERPLEXITY_SEMANTIC_THRESHOLD = 0.97
+PERPLEXITY_SEMANTIC_TTL_SECONDS = 86400
+# {(template_id, model, system_prompt): SemanticCache}
+_semantic_caches: Dict[tuple, SemanticCache] = {}
+_semantic_caches_lock = threading.Lock()
+
+# Requests currently in flight {cache_key: Future}. Jobs run on their own threads and
+# loops, so waiters share a thread-safe future rather than an asyncio one
+_inflight: Dict[str, concurrent.futures.Future] = {}
+_inflight_lock = threading.Lock()
+
+# Batch query templates {template_id: str.format template}. Agents send a
+# template_id plus params instead of a pre-formatted string, so cache keys
+# and semantic partitions are built from structured data
+TEMPLATES = {
+    # supplier_summary
+    "company_profile": '"{supplier}" company overview about us',
+    "linkedin": "{supplier} site:linkedin.com",
+    "recent_news": '"{supplier}" news 2024 OR 2025',
+    "contact": "{supplier} contact information email phone",
+    # combined_analysis - market
+    "alt_vs_supplier": '"{alt}" vs "{supplier}" comparison pricing {product}',
+    "market_position": "{supplier} market share position {product} industry",
+    "pricing_benchmarks": "{product} pricing benchmarks industry standard 2025",
+    # combined_analysis - offer
+    "standards": "{product} standard contract terms industry best practices",
+    "deliverables": "{product} typical deliverables scope of work",
+    "hidden_costs": "{product} hidden costs common issues pitfalls",
+    # outcome_assessment
+    "tactics": "negotiation tactics {product} contracts best practices",
+    "leverage": "supplier negotiation leverage points {product} procurement",
+}
+
+# Templates whose only param is the product go through the semantic cache. Queries
+# naming a company differ from another company's by a few characters and would
+# match it, so they are exact-match only
+SEMANTIC_TEMPLATE_IDS = frozenset(
+    template_id for template_id, template in TEMPLATES.items()
+    if {field for _, field, _, _ in string.Formatter().parse(template) if field} == {"product"}
+)
+
+
+def get_perplexity_cache() -> DiskCache:
+    """Get the on-disk Perplexity result cache (created on first use)."""
+    global _perplexity_cache
+    if _perplexity_cache is None:
+        _perplexity_cache = DiskCache(
+            os.path.join(get_settings().cache_dir, "perplexity"),
+            ttl_seconds=PERPLEXITY_CACHE_TTL_SECONDS,
+        )
+    return _perplexity_cache
+
+
+def get_perplexity_semantic_cache(template_id: str, model: str, system_prompt: str) -> SemanticCache:
+    """Get the in-memory semantic cache for one query template (created on first use)."""
+    partition = (template_id, model, system_prompt)
+    with _semantic_caches_lock:
+        cache = _semantic_caches.get(partition)
+        if cache is None:
+            cache = SemanticCache(
+                threshold=PERPLEXITY_SEMANTIC_THRESHOLD,
+                ttl_seconds=PERPLEXITY_SEMANTIC_TTL_SECONDS,
+            )
+            _semantic_caches[partition] = cache
+        return cache
+
+
+def render_query(query_item: Dict) -> str:
+    """
+    Get the query string for a batch item.
+
+    Args:
+        query_item: Batch item with 'template_id' and 'params', or a literal 'query'
+
+    Returns:
+        The rendered query string
+    """
+    if "params" in query_item:
+        return TEMPLATES[query_item["template_id"]].format(**query_item["params"])
+    return query_item["query"]
+
+
+def batch_item_cache_key(query_item: Dict, system_prompt: str, model: str) -> str:
+    """
+    Exact-match cache key for a batch item.
+
+    Templated items are keyed by (template_id, sorted params) rather than the
+    rendered string; literal queries fall back to perplexity_cache_key.
+    """
+    if "params" not in query_item:
+        return perplexity_cache_key(query_item["query"], system_prompt, model)
+    return make_cache_key("perplexity_template", {
+        "template_id": query_item["template_id"],
+        "params": sorted(query_item["params"].items()),
+        "system_prompt": system_prompt,
+        "model": model,
+    })
+
+
+def perplexity_cache_key(query: str, system_prompt: str, model: str, max_tokens: Optional[int] = None) -> str:
+    """Exact-match cache key covering everything that shapes a Perplexity answer."""
+    return make_cache_key("perplexity", {
+        "query": query,
+        "system_prompt": system_prompt,
+        "model": model,
+        "max_tokens": max_tokens,
+    })
+
 
 async def perplexity_search(
     query: str,
@@ -15,6 +141,8 @@ async def perplexity_search(
     model: str = "sonar-reasoning",
     api_key: str = "",
     max_retries: int = 3,
+    max_tokens: Optional[int] = None,
+    http_client: Optional[httpx.AsyncClient] = None,
 ) -> Dict:
     """
     Execute a search query using the Perplexity API.
@@ -25,6 +153,8 @@ async def perplexity_search(
         model: Perplexity model to use (default: sonar-reasoning)
         api_key: Perplexity API key
         max_retries: Maximum number of retry attempts
+        max_tokens: Optional cap on response tokens (bounds both transfer size and downstream prompt size)
+        http_client: Client to send the request with (default: the loop's pooled client shared with the LLM calls)
 
     Returns:
         Dict containing:
@@ -47,15 +177,15 @@ async def perplexity_search(
             {"role": "user", "content": query}
         ]
     }
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+
+    # Pooled and non-blocking - no executor thread or per-request connection setup
+    client = http_client or get_http_client()
 
     for attempt in range(max_retries):
         try:
-            # Run in executor to avoid blocking the event loop
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.post(url, headers=headers, json=payload, timeout=30)
-            )
+            response = await client.post(url, headers=headers, json=payload, timeout=30.0)
 
             if response.status_code == 200:
                 data = response.json()
@@ -70,8 +200,7 @@ async def perplexity_search(
 
                     # Clean up reasoning traces from sonar-reasoning model
                     # Remove <think>...</think> tags and their content
-                    import re
-                    content = re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL)
+                    content = _THINK_RE.sub('', content)
                     content = content.strip()
 
                     # Extract citations if available
@@ -86,8 +215,9 @@ async def perplexity_search(
                 }
 
             elif response.status_code == 429:
-                # Rate limit hit, wait and retry
-                wait_time = 2 ** attempt  # Exponential backoff
+                # Rate limit hit, wait and retry - honour Retry-After when the API sends one
+                retry_after = response.headers.get("retry-after", "")
+                wait_time = float(retry_after) if retry_after.isdigit() else 2 ** attempt  # Exponential backoff
                 logger.warning(f"[PERPLEXITY] Rate limit hit, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
                 await asyncio.sleep(wait_time)
                 continue
@@ -107,7 +237,7 @@ async def perplexity_search(
                     "error": error_msg
                 }
 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.warning(f"[PERPLEXITY] Timeout on attempt {attempt + 1}/{max_retries}")
             if attempt < max_retries - 1:
                 await asyncio.sleep(1)
@@ -142,6 +272,111 @@ async def perplexity_search(
     }
 
 
+async def coalesced_perplexity_search(
+    query: str,
+    system_prompt: str = "You are a helpful research assistant.",
+    model: str = "sonar-reasoning",
+    api_key: str = "",
+    max_retries: int = 3,
+    max_tokens: Optional[int] = None,
+) -> Dict:
+    """
+    perplexity_search that shares one request between concurrent identical queries.
+
+    Many queries depend only on product_type, so concurrent jobs (and agents
+    within a job) often ask the same thing at once. The first caller sends the
+    request; later callers with the same normalized query wait for its result.
+
+    Args:
+        Same as perplexity_search
+
+    Returns:
+        Same as perplexity_search
+    """
+    # Case and whitespace differences don't change the answer
+    normalized_query = " ".join(query.lower().split())
+    inflight_key = perplexity_cache_key(normalized_query, system_prompt, model, max_tokens)
+
+    with _inflight_lock:
+        future = _inflight.get(inflight_key)
+        is_owner = future is None
+        if is_owner:
+            future = concurrent.futures.Future()
+            _inflight[inflight_key] = future
+
+    if not is_owner:
+        logger.info(f"[PERPLEXITY] Joining in-flight request for query: {query[:80]}")
+        # Shield so a cancelled waiter doesn't cancel the shared future
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    try:
+        result = await perplexity_search(
+            query=query,
+            system_prompt=system_prompt,
+            model=model,
+            api_key=api_key,
+            max_retries=max_retries,
+            max_tokens=max_tokens,
+        )
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        # perplexity_search handles its own errors, so this is cancellation
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(inflight_key, None)
+
+
+async def cached_perplexity_search(
+    query: str,
+    system_prompt: str = "You are a helpful research assistant.",
+    model: str = "sonar-reasoning",
+    api_key: str = "",
+    max_retries: int = 3,
+    max_tokens: Optional[int] = None,
+) -> Dict:
+    """
+    perplexity_search backed by a content-addressed disk cache.
+
+    The key covers everything that shapes the answer (query, system prompt,
+    model, max_tokens). Only successful results are cached, so failures are
+    retried on the next job.
+
+    Args:
+        Same as perplexity_search
+
+    Returns:
+        Same as perplexity_search
+    """
+    cache = get_perplexity_cache()
+    cache_key = perplexity_cache_key(query, system_prompt, model, max_tokens)
+
+    cached_result = cache.get(cache_key)
+    if cached_result is not None:
+        logger.info(f"[PERPLEXITY] Cache hit for query: {query[:80]}")
+        return cached_result
+
+    result = await coalesced_perplexity_search(
+        query=query,
+        system_prompt=system_prompt,
+        model=model,
+        api_key=api_key,
+        max_retries=max_retries,
+        max_tokens=max_tokens,
+    )
+
+    if result.get("success"):
+        try:
+            cache.set(cache_key, result)
+        except OSError as e:
+            # Caching is best-effort - never fail the search over it
+            logger.warning(f"[PERPLEXITY] Could not write cache entry: {str(e)}")
+
+    return result
+
+
 async def perplexity_batch_search(
     queries: List[Dict[str, str]],
     api_key: str,
@@ -150,8 +385,13 @@ async def perplexity_batch_search(
     """
     Execute multiple search queries in parallel.
 
+    Identical queries already in flight (from this or another job) are joined
+    rather than sent again.
+
     Args:
-        queries: List of dicts with 'key' (identifier), 'query', and optional 'system_prompt'
+        queries: List of dicts with 'key' (identifier), 'template_id' and
+            'params' (rendered via TEMPLATES) or a literal 'query', and
+            optional 'system_prompt'
         api_key: Perplexity API key
         model: Perplexity model to use
 
@@ -163,12 +403,12 @@ async def perplexity_batch_search(
 
     for query_item in queries:
         key = query_item["key"]
-        query = query_item["query"]
+        query = render_query(query_item)
         system_prompt = query_item.get("system_prompt", "You are a helpful research assistant.")
 
         keys.append(key)
         tasks.append(
-            perplexity_search(
+            coalesced_perplexity_search(
                 query=query,
                 system_prompt=system_prompt,
                 model=model,
@@ -181,3 +421,93 @@ async def perplexity_batch_search(
 
     # Map results to keys
     return {key: result for key, result in zip(keys, results)}
+
+
+async def cached_perplexity_batch_search(
+    queries: List[Dict[str, str]],
+    api_key: str,
+    model: str = "sonar-reasoning",
+) -> Dict[str, Dict]:
+    """
+    perplexity_batch_search with an exact and a semantic cache in front of it.
+
+    Each query is first looked up in the disk cache by its exact key. Remaining
+    queries from SEMANTIC_TEMPLATE_IDS are embedded in one request and matched
+    against earlier answers from the same template; everything else is
+    exact-match only. Queries that miss go to Perplexity, in parallel, joining
+    identical requests already in flight. Successful answers are stored in
+    every layer that applies.
+
+    Args:
+        queries: List of dicts with 'key' (identifier), 'template_id' and
+            'params' (rendered via TEMPLATES) or a literal 'query', and optional
+            'system_prompt'
+        api_key: Perplexity API key
+        model: Perplexity model to use
+
+    Returns:
+        Dict mapping keys to search results
+    """
+    cache = get_perplexity_cache()
+    results: Dict[str, Dict] = {}
+
+    # Exact layer
+    misses = []
+    for query_item in queries:
+        system_prompt = query_item.get("system_prompt", "You are a helpful research assistant.")
+        cache_key = batch_item_cache_key(query_item, system_prompt, model)
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            results[query_item["key"]] = cached_result
+        else:
+            misses.append((query_item, render_query(query_item), system_prompt, cache_key))
+
+    if not misses:
+        logger.info(f"[PERPLEXITY] All {len(queries)} queries served from cache")
+        return results
+
+    # Semantic layer (product-only templates) - best-effort, a failed embedding call
+    # just means no fuzzy hits. Skipped entirely when no miss is eligible
+    semantic_misses = [miss for miss in misses if miss[0].get("template_id") in SEMANTIC_TEMPLATE_IDS]
+    embeddings_by_key: Dict[str, List[float]] = {}
+    if semantic_misses:
+        try:
+            embeddings = await get_embeddings().aembed_documents([query for _, query, _, _ in semantic_misses])
+            embeddings_by_key = {miss[0]["key"]: embedding for miss, embedding in zip(semantic_misses, embeddings)}
+        except Exception as e:
+            logger.warning(f"[PERPLEXITY] Query embedding failed, skipping semantic cache: {str(e)}")
+
+    to_fetch = []
+    for query_item, query, system_prompt, cache_key in misses:
+        embedding = embeddings_by_key.get(query_item["key"])
+        semantic_cache = None
+        if embedding is not None:
+            template_id = query_item["template_id"]
+            semantic_cache = get_perplexity_semantic_cache(template_id, model, system_prompt)
+            similar_result = semantic_cache.get(embedding)
+            if similar_result is not None:
+                logger.info(f"[PERPLEXITY] Semantic cache hit ({template_id}) for query: {query[:80]}")
+                results[query_item["key"]] = similar_result
+                continue
+        to_fetch.append((query_item, query, system_prompt, cache_key, embedding, semantic_cache))
+
+    logger.info(f"[PERPLEXITY] {len(queries) - len(to_fetch)}/{len(queries)} queries served from cache")
+
+    fetched = await asyncio.gather(*(
+        coalesced_perplexity_search(query=query, system_prompt=system_prompt, model=model, api_key=api_key)
+        for _, query, system_prompt, _, _, _ in to_fetch
+    ))
+
+    for (query_item, _, _, cache_key, embedding, semantic_cache), result in zip(to_fetch, fetched):
+        results[query_item["key"]] = result
+        if not result.get("success"):
+            continue
+        if semantic_cache is not None:
+            semantic_cache.add(embedding, result)
+        try:
+            cache.set(cache_key, result)
+        except OSError as e:
+            # Caching is best-effort - never fail the search over it
+            logger.warning(f"[PERPLEXITY] Could not write cache entry: {str(e)}")
+
+    return results
@@ -0,0 +1,216 @@
+"""Pre-flight compression of extracted document text before it is put into LLM prompts."""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+
+import tiktoken
+
+# Token budgets are measured with the tokenizer of the model the prompts go to
+TOKENIZER_MODEL = "gpt-4o"
+
+_WHITESPACE_RE = re.compile(r"[ \t\v\u00a0]+")
+
+# Page separator in extracted text (pdf_text_extractor joins pages with it)
+PAGE_BREAK = "\f"
+
+# Explicit page furniture only: "Page 3", "Page 3 of 10", "Page 3/10", "3 of 10".
+# Bare numbers are left alone - in offers they are quantities and prices
+_PAGE_FURNITURE_RE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s+of\s+\d+)$", re.IGNORECASE)
+
+# Lines this close to the top or bottom of a page can be running headers/footers
+_PAGE_EDGE_LINES = 2
+
+# Shorter edge lines are kept even when they recur: running headers/footers are
+# long, while short repeats ("1x", "EUR 0.00") are usually table content
+_MIN_RUNNING_LINE_LENGTH = 20
+
+
+def normalize_text(text: str) -> str:
+    """
+    Remove layout noise from extracted document text.
+
+    Collapses whitespace runs, drops empty lines and explicit page numbers, and
+    removes running headers/footers: long lines in the top (or bottom) lines
+    of a page that also appear in the top (or bottom) lines of another page.
+    The first occurrence is kept. Body lines are never deduplicated, so
+    repeated line items survive. Pages are split on PAGE_BREAK; text without
+    one is a single page and only loses whitespace and page numbers.
+
+    Args:
+        text: Extracted text (e.g. from pdf_text_extractor)
+
+    Returns:
+        Normalized text, one content line per line
+    """
+    if not text:
+        return ""
+
+    pages = []
+    for raw_page in text.split(PAGE_BREAK):
+        lines = []
+        for raw_line in raw_page.splitlines():
+            line = _WHITESPACE_RE.sub(" ", raw_line).strip()
+            if line and not _PAGE_FURNITURE_RE.match(line):
+                lines.append(line)
+        pages.append(lines)
+
+    # Headers recur at the top of pages, footers at the bottom
+    header_counts = Counter()
+    footer_counts = Counter()
+    for lines in pages:
+        header_counts.update(set(lines[:_PAGE_EDGE_LINES]))
+        footer_counts.update(set(lines[-_PAGE_EDGE_LINES:]))
+
+    def is_running(line: str, counts: Counter) -> bool:
+        return len(line) >= _MIN_RUNNING_LINE_LENGTH and counts[line] > 1
+
+    kept_lines = []
+    emitted_running = set()
+    for lines in pages:
+        for index, line in enumerate(lines):
+            running = (
+                (index < _PAGE_EDGE_LINES and is_running(line, header_counts))
+                or (index >= len(lines) - _PAGE_EDGE_LINES and is_running(line, footer_counts))
+            )
+            if running:
+                if line in emitted_running:
+                    continue
+                emitted_running.add(line)
+            kept_lines.append(line)
+
+    return "\n".join(kept_lines)
+
+
+# Normalization only shrinks text (whitespace, page numbers, running headers), so
+# normalizing this multiple of the budget leaves enough for the truncation after it
+_NORMALIZE_HEAD_FACTOR = 2
+
+
+def normalize_head(text: str, max_chars: int) -> str:
+    """
+    Normalize only the start of text that can survive truncation to max_chars.
+
+    For prompt builders that normalize and then truncate: the cost stays
+    bounded by the budget instead of growing with the document.
+
+    Args:
+        text: Extracted text (e.g. from pdf_text_extractor)
+        max_chars: Character budget of the truncation that follows (see
+            token_char_bound for token budgets)
+
+    Returns:
+        Normalized head of text
+    """
+    if not text:
+        return ""
+    return normalize_text(text[:max_chars * _NORMALIZE_HEAD_FACTOR])
+
+
+def content_chars(text: str, limit: int) -> int:
+    """
+    Count non-whitespace characters in text, stopping at limit.
+
+    For "is there enough text?" gates on whole documents: unlike
+    len(text.strip()) it neither copies the text nor scans past limit.
+
+    Args:
+        text: Text to inspect (may be None or empty)
+        limit: Count at which to stop scanning
+
+    Returns:
+        Number of non-whitespace characters, capped at limit
+    """
+    if not text:
+        return 0
+    return sum(1 for _ in islice((char for char in text if not char.isspace()), limit))
+
+
+def truncate_at_boundary(text: str, max_chars: int) -> str:
+    """
+    Truncate text to max_chars, preferring the last sentence or line boundary.
+
+    Only looks at the first max_chars characters, so it is cheap on long text.
+
+    Args:
+        text: Text to truncate (normalized or raw)
+        max_chars: Maximum length of the result
+
+    Returns:
+        Text at most max_chars long
+    """
+    if not text or len(text) <= max_chars:
+        return text or ""
+
+    return _cut_at_boundary(text[:max_chars])
+
+
+def _cut_at_boundary(truncated: str) -> str:
+    # Only cut back to a boundary that keeps most of the budget, so only the
+    # second half of the slice needs scanning
+    min_boundary = len(truncated) // 2
+    boundary = max(
+        truncated.rfind(". ", min_boundary),
+        truncated.rfind("! ", min_boundary),
+        truncated.rfind("? ", min_boundary),
+        truncated.rfind("\n", min_boundary),
+    )
+    if boundary >= 0:
+        truncated = truncated[:boundary + 1]
+    return truncated.rstrip()
+
+
+# tiktoken tokens rarely exceed this many characters, so a slice of
+# max_tokens * _MAX_CHARS_PER_TOKEN characters holds at least max_tokens tokens
+_MAX_CHARS_PER_TOKEN = 8
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> "tiktoken.Encoding":
+    # May download the BPE file on first use - warm_up_tokenizer loads it at startup
+    return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+
+
+def token_char_bound(max_tokens: int) -> int:
+    """Number of characters that always holds at least max_tokens tokens."""
+    return max_tokens * _MAX_CHARS_PER_TOKEN
+
+
+def warm_up_tokenizer():
+    """Load the tokenizer ahead of the first prompt (blocking; run in a worker thread)."""
+    _get_encoding()
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to max_tokens model tokens, preferring the last sentence or line boundary.
+
+    Gives prompt sections a predictable token footprint regardless of how
+    dense or multi-byte the text is, unlike character slicing.
+
+    Args:
+        text: Text to truncate (normalized or raw)
+        max_tokens: Maximum number of tokens in the result
+
+    Returns:
+        Text at most max_tokens tokens long
+    """
+    if not text:
+        return ""
+
+    # Tokens are at least one character, so shorter text always fits
+    if len(text) <= max_tokens:
+        return text
+
+    # Only the head of a long document can end up in the result - don't encode the rest
+    max_chars = token_char_bound(max_tokens)
+    head = text[:max_chars] if len(text) > max_chars else text
+
+    encoding = _get_encoding()
+    token_ids = encoding.encode(head, disallowed_special=())
+    if len(token_ids) <= max_tokens:
+        # The whole text fit, or a very sparse head did - cut it at a boundary
+        return text if head is text else _cut_at_boundary(head)
+
+    return _cut_at_boundary(encoding.decode(token_ids[:max_tokens]))
@@ -0,0 +1,19 @@
+"""Server-Sent Events framing for the streaming endpoints."""
+
+import orjson
+
+
+def sse_frame(payload: dict) -> bytes:
+    """
+    Encode a payload as one SSE data frame.
+
+    orjson serializes straight to compact UTF-8 bytes, several times faster
+    than json.dumps, and StreamingResponse sends bytes without re-encoding.
+
+    Args:
+        payload: JSON-serializable event data
+
+    Returns:
+        b"data: <json>\\n\\n"
+    """
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
@@ -77,7 +77,8 @@ except ImportError as e:
     print(f"❌ app.agents.state: {e}")
 
 try:
-    from app.agents.graph import negotiation_graph
+    from app.agents.graph import get_negotiation_graph
+    get_negotiation_graph()
     print("✅ app.agents.graph")
 except ImportError as e:
     print(f"❌ app.agents.graph: {e}")